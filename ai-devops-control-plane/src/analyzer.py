@@ -1,15 +1,21 @@
 """Core risk analysis engine."""
 
+import asyncio
+import copy
+import hashlib
 import json
 import logging
+import re
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional
-from openai import OpenAI
+from openai import AsyncOpenAI
 import httpx
 
 from .config import get_settings
 from .models import (
-    AnalyzeChangeRequest, AnalyzeChangeResponse, RiskAssessment,
+    AnalyzeChangeRequest, AnalyzeChangeResponse, AnalyzeBatchRequest, RiskAssessment,
     RiskLevel, RolloutRecommendation, ContributingFactor, Evidence,
     SimilarIncident, ChangeDetail
 )
@@ -40,27 +46,126 @@ ROLLOUT RECOMMENDATIONS:
 - canary_recommended: Medium risk, deploy to small subset first
 - feature_flag_first: Can be toggled off quickly
 - needs_human_review: Requires SRE/on-call approval
-- pause_deployment: Critical risk, do not proceed
-
-OUTPUT SCHEMA:
-{
-  "risk_score": 0.0-1.0,
-  "risk_level": "low|medium|high|critical",
-  "contributing_factors": [
-    {
-      "factor": "Factor name",
-      "impact": "high|medium|low",
-      "description": "Why this increases risk",
-      "evidence_indices": [0, 1]
-    }
-  ],
-  "blast_radius": ["service1", "service2"],
-  "change_velocity": "high|medium|low",
-  "rollout_recommendation": "safe_to_deploy|canary_recommended|...",
-  "confidence": 0.0-1.0,
-  "unknowns": ["Unknown factor 1", "Unknown factor 2"],
-  "refusal_reason": null or "Explanation"
-}"""
+- pause_deployment: Critical risk, do not proceed"""
+
+
+# Output schema enforced server-side via structured outputs. Strict mode
+# requires every property to be listed as required and no extra keys.
+RISK_ASSESSMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "risk_score": {"type": "number", "description": "0.0-1.0"},
+        "risk_level": {"type": "string", "enum": [level.value for level in RiskLevel]},
+        "contributing_factors": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "factor": {"type": "string", "description": "Factor name"},
+                    "impact": {"type": "string", "enum": ["high", "medium", "low"]},
+                    "description": {"type": "string", "description": "Why this increases risk"},
+                    "evidence_indices": {"type": "array", "items": {"type": "integer"}}
+                },
+                "required": ["factor", "impact", "description", "evidence_indices"],
+                "additionalProperties": False
+            }
+        },
+        "blast_radius": {"type": "array", "items": {"type": "string"}},
+        "change_velocity": {"type": "string", "enum": ["high", "medium", "low"]},
+        "rollout_recommendation": {
+            "type": "string",
+            "enum": [rec.value for rec in RolloutRecommendation]
+        },
+        "confidence": {"type": "number", "description": "0.0-1.0"},
+        "unknowns": {"type": "array", "items": {"type": "string"}},
+        "refusal_reason": {"type": ["string", "null"]}
+    },
+    "required": [
+        "risk_score", "risk_level", "contributing_factors", "blast_radius",
+        "change_velocity", "rollout_recommendation", "confidence", "unknowns",
+        "refusal_reason"
+    ],
+    "additionalProperties": False
+}
+
+
+# Static analysis instructions sent ahead of the per-change prompt. Kept
+# byte-for-byte identical across calls so the provider can serve the shared
+# prefix (system prompt + instructions) from its prompt cache.
+RISK_ANALYSIS_INSTRUCTIONS = """Analyze the risk of the change described in the next message.
+
+The message is organized into these sections:
+- SIMILAR PAST INCIDENTS: incidents from the Incident Investigator that may be related
+- HISTORICAL EVIDENCE: excerpts from past changes and incidents, numbered [0], [1], ...
+- CHANGE DETAILS: service, type, version, author and environment of the change
+- DIFF SUMMARY: what the change modifies
+- CHANGE VELOCITY FOR SERVICE: how frequently the service has changed recently
+- FOCUS AREA / IGNORE FACTORS: optional analyst constraints, present only when set
+
+Cite historical evidence by its index in evidence_indices.
+Analyze the risk and provide the assessment as JSON."""
+
+
+# Instructions for assessing several changes in one call. The user message
+# holds one "=== CHANGE [i] ===" block per change, each with its own
+# evidence list, followed by the shared analyst constraints.
+RISK_ANALYSIS_BATCH_INSTRUCTIONS = """Analyze the risk of each change described in the next message.
+
+The message contains one block per change, headed "=== CHANGE [i] ===". Each block has:
+- SIMILAR PAST INCIDENTS: incidents from the Incident Investigator that may be related
+- HISTORICAL EVIDENCE: excerpts from past changes and incidents, numbered [0], [1], ...
+- CHANGE DETAILS: service, type, version, author and environment of the change
+- DIFF SUMMARY: what the change modifies
+- CHANGE VELOCITY FOR SERVICE: how frequently the service has changed recently
+FOCUS AREA / IGNORE FACTORS after the last block apply to every change.
+
+Assess each change independently. Evidence indices refer to the evidence list of
+the same change block. Return one assessment per change with change_index set to i."""
+
+
+RISK_ASSESSMENT_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "assessments": {
+            "type": "array",
+            "items": {
+                **RISK_ASSESSMENT_SCHEMA,
+                "properties": {
+                    "change_index": {"type": "integer"},
+                    **RISK_ASSESSMENT_SCHEMA["properties"]
+                },
+                "required": ["change_index", *RISK_ASSESSMENT_SCHEMA["required"]]
+            }
+        }
+    },
+    "required": ["assessments"],
+    "additionalProperties": False
+}
+
+
+# Topics used to correlate a change with past incidents. "database" and "db"
+# are the same topic; matching is anchored at word starts so "auth" still
+# covers "authentication".
+INCIDENT_KEYWORDS = re.compile(r"\b(database|db|connection|pool|auth)")
+
+
+def _incident_topics(text: str) -> set[str]:
+    """Extract correlation topics from lowercased text in a single pass."""
+    return {"db" if m == "database" else m for m in INCIDENT_KEYWORDS.findall(text)}
+
+
+# Longest evidence excerpt embedded in a prompt, in characters. Longer
+# excerpts keep their head and tail, which carry the summary and the most
+# specific details of a diff.
+MAX_EXCERPT = 512
+
+
+def _truncate_excerpt(excerpt: str) -> str:
+    """Cap an excerpt at MAX_EXCERPT characters using head/tail extraction."""
+    if len(excerpt) <= MAX_EXCERPT:
+        return excerpt
+    half = (MAX_EXCERPT - len(" ... ")) // 2
+    return excerpt[:half] + " ... " + excerpt[-half:]
 
 
 class RiskAnalyzer:
@@ -71,10 +176,38 @@ class RiskAnalyzer:
         self.change_store = change_store
         self.settings = get_settings()
         
-        self.openai_client = OpenAI(
+        self.openai_client = AsyncOpenAI(
             api_key=self.settings.openai_api_key,
             base_url=self.settings.openai_api_base
         )
+        
+        # Parsed LLM assessments keyed by request fingerprint: key -> (stored_at, result)
+        self._assessment_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        
+        # Incident Investigator responses: "cases" or "case:<id>" -> (stored_at, payload)
+        self._incident_cache: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        
+        # Pooled client for the Incident Investigator, created on startup
+        self._http: Optional[httpx.AsyncClient] = None
+        # Case detail requests in flight across all analyses
+        self._incident_fetch_semaphore = asyncio.Semaphore(
+            self.settings.incident_fetch_max_concurrency
+        )
+    
+    async def startup(self) -> None:
+        """Open the pooled HTTP client used for incident lookups."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=100)
+            )
+    
+    async def shutdown(self) -> None:
+        """Close pooled HTTP clients."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        await self.openai_client.close()
     
     async def analyze(
         self,
@@ -83,74 +216,186 @@ class RiskAnalyzer:
     ) -> AnalyzeChangeResponse:
         """Perform full risk analysis on a change."""
         
-        # Step 1: Search for similar past changes
-        similar_changes = self.vector_store.search_similar_changes(
-            query=f"{change.service} {change.change_type} {change.diff_summary}",
-            service=change.service,
-            top_k=self.settings.default_top_k,
-            exclude_change_id=change.change_id
+        # Steps 1-4: Gather history and check if we have enough evidence
+        context = await self._gather_context(change)
+        if request.strict_mode and self._insufficient_evidence(context):
+            return self._strict_refusal(change, context)
+        
+        # Step 5: Build evidence context
+        all_evidence = self._build_evidence(context)
+        
+        # Step 6: Generate risk assessment with LLM
+        llm_result, llm_metadata = await self._generate_assessment(
+            change=change,
+            evidence=all_evidence,
+            similar_incidents=context["similar_incidents"],
+            change_velocity=context["change_velocity"],
+            request=request
+        )
+        
+        # Step 7: Build response
+        return self._build_response(change, request, context, all_evidence, llm_result, llm_metadata)
+    
+    async def analyze_batch(
+        self,
+        changes: list[ChangeDetail],
+        request: AnalyzeBatchRequest
+    ) -> list[AnalyzeChangeResponse]:
+        """Analyze several changes, sharing LLM calls between them.
+        
+        History lookups run concurrently for all changes. Changes that are
+        not refused by strict mode or served from the assessment cache are
+        assessed in groups of up to ``llm_batch_max_changes`` per LLM call.
+        """
+        contexts = await asyncio.gather(*(self._gather_context(change) for change in changes))
+        
+        results: list[Optional[AnalyzeChangeResponse]] = [None] * len(changes)
+        pending = []  # (position, evidence, cache key)
+        for i, (change, context) in enumerate(zip(changes, contexts)):
+            if request.strict_mode and self._insufficient_evidence(context):
+                results[i] = self._strict_refusal(change, context)
+                continue
+            
+            evidence = self._build_evidence(context)
+            cache_key = self._assessment_cache_key(change, evidence, context["change_velocity"], request)
+            cached = self._get_cached_assessment(cache_key)
+            if cached is not None:
+                results[i] = self._build_response(
+                    change, request, context, evidence, cached,
+                    {"prompt_tokens": 0, "cached_tokens": 0, "cache_hit": True}
+                )
+            else:
+                pending.append((i, evidence, cache_key))
+        
+        batch_size = self.settings.llm_batch_max_changes
+        groups = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        batch_outputs = await asyncio.gather(*(
+            self._generate_batch_assessment(
+                [(changes[i], evidence, contexts[i]) for i, evidence, _ in group],
+                request
+            )
+            for group in groups
+        ))
+        
+        for group, (llm_results, llm_metadata) in zip(groups, batch_outputs):
+            for (i, evidence, cache_key), llm_result in zip(group, llm_results):
+                if llm_result.pop("_from_llm", False):
+                    self._store_cached_assessment(cache_key, llm_result)
+                results[i] = self._build_response(
+                    changes[i], request, contexts[i], evidence, llm_result,
+                    {**llm_metadata, "cache_hit": False, "batch_size": len(group)}
+                )
+        
+        return results
+    
+    async def _gather_context(self, change: ChangeDetail) -> dict:
+        """Collect historical context for a change.
+        
+        Similar past changes, service change velocity and similar incidents
+        are independent, so they are fetched concurrently.
+        """
+        similar_changes, recent_changes, similar_incidents = await asyncio.gather(
+            self.vector_store.search_similar_changes(
+                query=f"{change.service} {change.change_type} {change.diff_summary}",
+                service=change.service,
+                top_k=self.settings.default_top_k,
+                exclude_change_id=change.change_id
+            ),
+            asyncio.to_thread(self.change_store.get_service_changes, change.service, limit=20),
+            self._fetch_similar_incidents(change)
         )
         
-        # Step 2: Get service change velocity
-        recent_changes = self.change_store.get_service_changes(change.service, limit=20)
-        change_velocity = self._calculate_velocity(recent_changes)
+        evidence_count = len(similar_changes) + len(similar_incidents)
+        total_relevance = (
+            sum(e.relevance for e in similar_changes)
+            + sum(inc.similarity_score for inc in similar_incidents)
+        )
         
-        # Step 3: Fetch similar incidents from Incident Investigator
-        similar_incidents = await self._fetch_similar_incidents(change)
+        return {
+            "similar_changes": similar_changes,
+            "similar_incidents": similar_incidents,
+            "change_velocity": self._calculate_velocity(recent_changes),
+            "evidence_count": evidence_count,
+            "avg_relevance": total_relevance / evidence_count if evidence_count else 0
+        }
+    
+    def _insufficient_evidence(self, context: dict) -> bool:
+        """Whether strict mode should refuse to score."""
+        return (
+            context["evidence_count"] < 2
+            or context["avg_relevance"] < self.settings.confidence_threshold
+        )
+    
+    def _strict_refusal(self, change: ChangeDetail, context: dict) -> AnalyzeChangeResponse:
+        """Neutral response returned when strict mode lacks evidence."""
+        return AnalyzeChangeResponse(
+            change_id=change.change_id,
+            service=change.service,
+            change_type=change.change_type,
+            assessment=RiskAssessment(
+                risk_score=0.5,  # Neutral when unknown
+                risk_level=RiskLevel.MEDIUM,
+                contributing_factors=[],
+                similar_past_incidents=context["similar_incidents"],
+                rollout_recommendation=RolloutRecommendation.NEEDS_HUMAN_REVIEW,
+                confidence=context["avg_relevance"],
+                refusal_reason="Insufficient historical data to assess risk. No similar changes or incidents found. Human review recommended.",
+                unknowns=[
+                    "No historical changes for this service",
+                    "No similar incidents in database",
+                    "Unable to determine blast radius"
+                ]
+            ),
+            blast_radius=[change.service],
+            change_velocity=context["change_velocity"],
+            analysis_metadata={
+                "evidence_count": context["evidence_count"],
+                "avg_relevance": round(context["avg_relevance"], 4),
+                "strict_mode": True
+            }
+        )
+    
+    def _build_evidence(self, context: dict) -> list[Evidence]:
+        """Combine similar-change evidence with evidence from similar incidents.
         
-        # Step 4: Build evidence context
-        all_evidence = similar_changes + [
+        The same change or incident can surface through both lookups, so
+        duplicates are collapsed by (source, source_type), keeping the most
+        relevant copy. The result is ordered by relevance and capped at
+        ``default_top_k`` to bound the prompt size.
+        """
+        candidates = context["similar_changes"] + [
             Evidence(
                 source=f"incident:{inc.case_id}",
                 excerpt=f"Incident: {inc.title}. Root cause: {inc.root_cause or 'Unknown'}",
                 relevance=inc.similarity_score,
                 source_type="incident"
             )
-            for inc in similar_incidents
+            for inc in context["similar_incidents"]
         ]
         
-        # Step 5: Check if we have enough evidence
-        avg_relevance = sum(e.relevance for e in all_evidence) / len(all_evidence) if all_evidence else 0
-        
-        if request.strict_mode and (len(all_evidence) < 2 or avg_relevance < self.settings.confidence_threshold):
-            return AnalyzeChangeResponse(
-                change_id=change.change_id,
-                service=change.service,
-                change_type=change.change_type,
-                assessment=RiskAssessment(
-                    risk_score=0.5,  # Neutral when unknown
-                    risk_level=RiskLevel.MEDIUM,
-                    contributing_factors=[],
-                    similar_past_incidents=similar_incidents,
-                    rollout_recommendation=RolloutRecommendation.NEEDS_HUMAN_REVIEW,
-                    confidence=avg_relevance,
-                    refusal_reason="Insufficient historical data to assess risk. No similar changes or incidents found. Human review recommended.",
-                    unknowns=[
-                        "No historical changes for this service",
-                        "No similar incidents in database",
-                        "Unable to determine blast radius"
-                    ]
-                ),
-                blast_radius=[change.service],
-                change_velocity=change_velocity,
-                analysis_metadata={
-                    "evidence_count": len(all_evidence),
-                    "avg_relevance": round(avg_relevance, 4),
-                    "strict_mode": True
-                }
-            )
-        
-        # Step 6: Generate risk assessment with LLM
-        llm_result = self._generate_assessment(
-            change=change,
-            evidence=all_evidence,
-            similar_incidents=similar_incidents,
-            change_velocity=change_velocity,
-            request=request
-        )
+        seen: dict[tuple[str, str], Evidence] = {}
+        for ev in candidates:
+            key = (ev.source, ev.source_type)
+            if key not in seen or ev.relevance > seen[key].relevance:
+                seen[key] = ev
         
-        # Step 7: Build response
-        assessment = self._build_assessment(llm_result, all_evidence, similar_incidents)
+        evidence = sorted(seen.values(), key=lambda e: e.relevance, reverse=True)
+        return evidence[:self.settings.default_top_k]
+    
+    def _build_response(
+        self,
+        change: ChangeDetail,
+        request: AnalyzeChangeRequest,
+        context: dict,
+        evidence: list[Evidence],
+        llm_result: dict,
+        llm_metadata: dict
+    ) -> AnalyzeChangeResponse:
+        """Build the analysis response from an LLM assessment."""
+        assessment = self._build_assessment(llm_result, evidence, context["similar_incidents"])
+        truncated = sum(1 for ev in evidence if len(ev.excerpt) > MAX_EXCERPT)
+        if truncated:
+            logger.info(f"Truncated {truncated}/{len(evidence)} evidence excerpts for change {change.change_id}")
         
         return AnalyzeChangeResponse(
             change_id=change.change_id,
@@ -158,12 +403,14 @@ class RiskAnalyzer:
             change_type=change.change_type,
             assessment=assessment,
             blast_radius=llm_result.get("blast_radius", [change.service]),
-            change_velocity=llm_result.get("change_velocity", change_velocity),
+            change_velocity=llm_result.get("change_velocity", context["change_velocity"]),
             analysis_metadata={
-                "evidence_count": len(all_evidence),
-                "avg_relevance": round(avg_relevance, 4),
+                "evidence_count": len(evidence),
+                "evidence_truncated_count": truncated,
+                "avg_relevance": round(context["avg_relevance"], 4),
                 "strict_mode": request.strict_mode,
-                "model": self.settings.chat_model
+                "model": self.settings.chat_model,
+                **llm_metadata
             }
         )
     
@@ -178,76 +425,298 @@ class RiskAnalyzer:
     
     async def _fetch_similar_incidents(self, change: ChangeDetail) -> list[SimilarIncident]:
         """Fetch similar incidents from Incident Investigator service."""
-        similar = []
+        # No-op once the app lifespan has opened the client
+        await self.startup()
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
+            cases = self._get_cached_incidents(
+                "cases", self.settings.incident_list_cache_ttl_seconds
+            )
+            if cases is None:
+                response = await self._http.get(
                     f"{self.settings.incident_service_url}/cases"
                 )
-                if response.status_code == 200:
-                    data = response.json()
-                    cases = data.get("cases", [])
-                    
-                    # Simple keyword matching for now
-                    service_lower = change.service.lower()
-                    diff_lower = change.diff_summary.lower()
-                    
-                    for case in cases[:20]:
-                        title_lower = case.get("title", "").lower()
-                        
-                        # Check if incident might be related
-                        if (service_lower in title_lower or
-                            "database" in diff_lower and "db" in title_lower or
-                            "connection" in diff_lower and "connection" in title_lower or
-                            "pool" in diff_lower and "pool" in title_lower or
-                            "auth" in diff_lower and "auth" in title_lower):
-                            
-                            # Fetch full case for root cause
-                            try:
-                                case_response = await client.get(
-                                    f"{self.settings.incident_service_url}/cases/{case['case_id']}"
-                                )
-                                if case_response.status_code == 200:
-                                    case_detail = case_response.json()
-                                    root_cause = None
-                                    if case_detail.get("last_analysis"):
-                                        hyps = case_detail["last_analysis"].get("hypotheses", [])
-                                        if hyps:
-                                            root_cause = hyps[0].get("root_cause", "")
-                                    
-                                    similar.append(SimilarIncident(
-                                        case_id=case["case_id"],
-                                        title=case.get("title", ""),
-                                        similarity_score=0.7 if service_lower in title_lower else 0.5,
-                                        root_cause=root_cause,
-                                        occurred_at=datetime.fromisoformat(case["created_at"]) if case.get("created_at") else None
-                                    ))
-                            except Exception:
-                                similar.append(SimilarIncident(
-                                    case_id=case["case_id"],
-                                    title=case.get("title", ""),
-                                    similarity_score=0.5
-                                ))
+                if response.status_code != 200:
+                    return []
+                cases = response.json().get("cases", [])
+                self._cache_incidents("cases", cases)
+            
+            if not cases:
+                return []
+            
+            try:
+                return await self._search_incidents_by_vector(change, cases)
+            except Exception as e:
+                logger.warning(f"Vector incident search failed, using keyword matching: {e}")
+                return await self._match_incidents_by_keyword(change, cases)
         except Exception as e:
             logger.warning(f"Failed to fetch incidents: {e}")
+            return []
+    
+    async def _search_incidents_by_vector(self, change: ChangeDetail, cases: list[dict]) -> list[SimilarIncident]:
+        """Rank incidents by embedding similarity, indexing new or re-analyzed cases first."""
+        indexed = await asyncio.to_thread(
+            self.vector_store.get_indexed_incidents, [case["case_id"] for case in cases]
+        )
+        stale = [
+            case for case in cases
+            if case["case_id"] not in indexed
+            or (case.get("last_analysis") or "") != indexed[case["case_id"]]
+        ]
+        
+        if stale:
+            # A cold index is filled over several requests rather than by
+            # fetching and embedding every case in this one
+            limit = self.settings.incident_index_max_per_request
+            if len(stale) > limit:
+                logger.info(f"Indexing {limit} of {len(stale)} new or re-analyzed incidents")
+                stale = stale[:limit]
+            details = await self._fetch_case_details([case["case_id"] for case in stale])
+            # Cases whose detail fetch failed are retried on the next call
+            await self.vector_store.index_incidents([
+                {
+                    "case_id": case["case_id"],
+                    "title": case.get("title", ""),
+                    "root_cause": self._root_cause(details.get(case["case_id"])),
+                    "created_at": case.get("created_at"),
+                    "last_analysis": case.get("last_analysis")
+                }
+                for case in stale
+                if not isinstance(details.get(case["case_id"]), Exception)
+            ])
+        
+        return await self.vector_store.search_similar_incidents(
+            query=f"{change.service} {change.change_type} {change.diff_summary}",
+            top_k=5,
+            min_similarity=self.settings.incident_min_similarity
+        )
+    
+    async def _match_incidents_by_keyword(self, change: ChangeDetail, cases: list[dict]) -> list[SimilarIncident]:
+        """Match incidents whose titles name the service or share a topic with the diff."""
+        service_lower = change.service.lower()
+        diff_topics = _incident_topics(change.diff_summary.lower())
+        
+        matched = []
+        for case in cases[:20]:
+            title_lower = case.get("title", "").lower()
+            
+            # Related if it names the service or shares a topic with the diff
+            if service_lower in title_lower or (
+                diff_topics and diff_topics & _incident_topics(title_lower)
+            ):
+                matched.append(case)
+        
+        details = await self._fetch_case_details([case["case_id"] for case in matched])
+        
+        similar = []
+        for case in matched:
+            case_detail = details.get(case["case_id"])
+            if case_detail is None:
+                continue
+            
+            title_lower = case.get("title", "").lower()
+            try:
+                if isinstance(case_detail, Exception):
+                    raise case_detail
+                similar.append(SimilarIncident(
+                    case_id=case["case_id"],
+                    title=case.get("title", ""),
+                    similarity_score=0.7 if service_lower in title_lower else 0.5,
+                    root_cause=self._root_cause(case_detail),
+                    occurred_at=datetime.fromisoformat(case["created_at"]) if case.get("created_at") else None
+                ))
+            except Exception:
+                similar.append(SimilarIncident(
+                    case_id=case["case_id"],
+                    title=case.get("title", ""),
+                    similarity_score=0.5
+                ))
         
         return similar[:5]
     
-    def _generate_assessment(
+    async def _fetch_case_details(self, case_ids: list[str]) -> dict:
+        """Fetch case details in parallel, reusing cached ones.
+        
+        Maps each case ID to its detail dict, the exception raised while
+        fetching it, or None when the service returned a non-200 status.
+        """
+        details = {
+            case_id: self._get_cached_incidents(
+                f"case:{case_id}", self.settings.incident_detail_cache_ttl_seconds
+            )
+            for case_id in case_ids
+        }
+        to_fetch = [case_id for case_id, detail in details.items() if detail is None]
+        case_responses = await asyncio.gather(
+            *(self._get_case(case_id) for case_id in to_fetch),
+            return_exceptions=True
+        )
+        for case_id, case_response in zip(to_fetch, case_responses):
+            if isinstance(case_response, Exception):
+                details[case_id] = case_response
+            elif case_response.status_code == 200:
+                try:
+                    details[case_id] = case_response.json()
+                    self._cache_incidents(f"case:{case_id}", details[case_id])
+                except Exception as e:
+                    details[case_id] = e
+        
+        return details
+    
+    async def _get_case(self, case_id: str) -> httpx.Response:
+        """GET one case, bounded by INCIDENT_FETCH_MAX_CONCURRENCY."""
+        async with self._incident_fetch_semaphore:
+            return await self._http.get(f"{self.settings.incident_service_url}/cases/{case_id}")
+    
+    def _root_cause(self, case_detail) -> Optional[str]:
+        """Top-ranked hypothesis root cause from a case detail, if any."""
+        if not isinstance(case_detail, dict) or not case_detail.get("last_analysis"):
+            return None
+        hyps = case_detail["last_analysis"].get("hypotheses", [])
+        if hyps:
+            return hyps[0].get("root_cause", "")
+        return None
+    
+    def _get_cached_incidents(self, key: str, ttl_seconds: int):
+        """Return a cached Incident Investigator payload if still fresh."""
+        entry = self._incident_cache.get(key)
+        if entry is None:
+            return None
+        
+        stored_at, payload = entry
+        if time.monotonic() - stored_at > ttl_seconds:
+            del self._incident_cache[key]
+            return None
+        
+        self._incident_cache.move_to_end(key)
+        return payload
+    
+    def _cache_incidents(self, key: str, payload) -> None:
+        """Cache an Incident Investigator payload, evicting the least recently used entries."""
+        self._incident_cache[key] = (time.monotonic(), payload)
+        self._incident_cache.move_to_end(key)
+        while len(self._incident_cache) > self.settings.incident_cache_max_entries:
+            self._incident_cache.popitem(last=False)
+    
+    def invalidate_incident_cache(self) -> None:
+        """Drop cached incident listings and case details."""
+        self._incident_cache.clear()
+    
+    async def _generate_assessment(
         self,
         change: ChangeDetail,
         evidence: list[Evidence],
         similar_incidents: list[SimilarIncident],
         change_velocity: str,
         request: AnalyzeChangeRequest
-    ) -> dict:
-        """Use LLM to generate risk assessment."""
+    ) -> tuple[dict, dict]:
+        """Use LLM to generate risk assessment.
+        
+        Returns the parsed assessment and LLM call metadata. Results are
+        cached per change/evidence fingerprint so retries and re-analysis
+        skip the LLM round-trip.
+        """
+        
+        cache_key = self._assessment_cache_key(change, evidence, change_velocity, request)
+        cached = self._get_cached_assessment(cache_key)
+        if cached is not None:
+            return cached, {"prompt_tokens": 0, "cached_tokens": 0, "cache_hit": True}
+        
+        # Semi-static context first, per-change fields last
+        user_prompt = (
+            self._change_context(change, evidence, similar_incidents, change_velocity)
+            + "\n\n" + self._analysis_constraints(request)
+        )
+
+        try:
+            content, usage = await self._complete(
+                messages=[
+                    {"role": "system", "content": RISK_ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "system", "content": RISK_ANALYSIS_INSTRUCTIONS},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=1500,
+                schema_name="risk_assessment",
+                schema=RISK_ASSESSMENT_SCHEMA
+            )
+            
+            result = json.loads(content or "{}")
+            self._store_cached_assessment(cache_key, result)
+            return result, {**self._usage_metadata(usage), "cache_hit": False}
+            
+        except Exception as e:
+            logger.error(f"LLM generation error: {e}")
+            return (
+                self._fallback_assessment(change, change_velocity, f"Analysis error: {str(e)}"),
+                {"prompt_tokens": 0, "cached_tokens": 0, "cache_hit": False}
+            )
+    
+    async def _generate_batch_assessment(
+        self,
+        items: list[tuple[ChangeDetail, list[Evidence], dict]],
+        request: AnalyzeBatchRequest
+    ) -> tuple[list[dict], dict]:
+        """Assess several changes with one LLM call.
+        
+        Takes (change, evidence, context) items and returns one assessment
+        per item, in order, plus the shared call metadata. Assessments that
+        came from the LLM are marked with ``_from_llm`` so the caller can
+        cache them; missing ones fall back to a needs-review assessment.
+        """
+        sections = [
+            f"=== CHANGE [{i}] ===\n"
+            + self._change_context(change, evidence, context["similar_incidents"], context["change_velocity"])
+            for i, (change, evidence, context) in enumerate(items)
+        ]
+        user_prompt = "\n\n".join(sections) + "\n\n" + self._analysis_constraints(request)
+        
+        try:
+            content, usage = await self._complete(
+                messages=[
+                    {"role": "system", "content": RISK_ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "system", "content": RISK_ANALYSIS_BATCH_INSTRUCTIONS},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=min(1500 * len(items), 16000),
+                schema_name="risk_assessment_batch",
+                schema=RISK_ASSESSMENT_BATCH_SCHEMA
+            )
+            
+            by_index = {}
+            for assessment in json.loads(content or "{}").get("assessments", []):
+                by_index[assessment.pop("change_index", None)] = assessment
+            metadata = self._usage_metadata(usage)
+        except Exception as e:
+            logger.error(f"LLM batch generation error: {e}")
+            by_index = {}
+            metadata = {"prompt_tokens": 0, "cached_tokens": 0}
+            error = f"Analysis error: {str(e)}"
+        else:
+            error = "Analysis error: no assessment returned for this change"
+        
+        results = []
+        for i, (change, _, context) in enumerate(items):
+            if i in by_index:
+                results.append({**by_index[i], "_from_llm": True})
+            else:
+                results.append(self._fallback_assessment(change, context["change_velocity"], error))
+        return results, metadata
+    
+    def _change_context(
+        self,
+        change: ChangeDetail,
+        evidence: list[Evidence],
+        similar_incidents: list[SimilarIncident],
+        change_velocity: str
+    ) -> str:
+        """Format the prompt sections describing one change and its history."""
         
         # Build evidence context
         evidence_context = []
         for i, ev in enumerate(evidence):
-            evidence_context.append(f"[{i}] Source: {ev.source} ({ev.source_type})\n{ev.excerpt}")
+            evidence_context.append(
+                f"[{i}] Source: {ev.source} ({ev.source_type})\n{_truncate_excerpt(ev.excerpt)}"
+            )
         
         incidents_context = "\n".join([
             f"- {inc.title} (similarity: {inc.similarity_score:.0%})"
@@ -255,7 +724,11 @@ class RiskAnalyzer:
             for inc in similar_incidents
         ]) or "No similar incidents found."
         
-        user_prompt = f"""Analyze the risk of this change:
+        return f"""SIMILAR PAST INCIDENTS:
+{incidents_context}
+
+HISTORICAL EVIDENCE (cite by index):
+{chr(10).join(evidence_context) if evidence_context else "No historical data available."}
 
 CHANGE DETAILS:
 - Service: {change.service}
@@ -267,47 +740,125 @@ CHANGE DETAILS:
 DIFF SUMMARY:
 {change.diff_summary}
 
-CHANGE VELOCITY FOR SERVICE: {change_velocity}
-
-SIMILAR PAST INCIDENTS:
-{incidents_context}
-
-HISTORICAL EVIDENCE (cite by index):
-{chr(10).join(evidence_context) if evidence_context else "No historical data available."}
-
-{f"FOCUS AREA: {request.focus_area.value}" if request.focus_area else ""}
-{f"IGNORE FACTORS: {', '.join(request.ignore_factors)}" if request.ignore_factors else ""}
-
-Analyze the risk and provide assessment following the exact JSON schema."""
-
-        try:
-            response = self.openai_client.chat.completions.create(
-                model=self.settings.chat_model,
-                messages=[
-                    {"role": "system", "content": RISK_ANALYSIS_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.2,
-                max_tokens=1500,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content or "{}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"LLM generation error: {e}")
-            return {
-                "risk_score": 0.5,
-                "risk_level": "medium",
-                "contributing_factors": [],
-                "blast_radius": [change.service],
-                "change_velocity": change_velocity,
-                "rollout_recommendation": "needs_human_review",
-                "confidence": 0.0,
-                "unknowns": ["Analysis error occurred"],
-                "refusal_reason": f"Analysis error: {str(e)}"
+CHANGE VELOCITY FOR SERVICE: {change_velocity}"""
+    
+    def _analysis_constraints(self, request: AnalyzeChangeRequest) -> str:
+        """Format the optional analyst constraints."""
+        return f"""{f"FOCUS AREA: {request.focus_area.value}" if request.focus_area else ""}
+{f"IGNORE FACTORS: {', '.join(request.ignore_factors)}" if request.ignore_factors else ""}"""
+    
+    async def _complete(
+        self,
+        messages: list[dict],
+        max_tokens: int,
+        schema_name: str,
+        schema: dict
+    ) -> tuple[str, object]:
+        """Run a structured-output chat completion and return content and usage."""
+        completion_args = dict(
+            model=self.settings.chat_model,
+            messages=messages,
+            temperature=0.2,
+            max_tokens=max_tokens,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": schema_name,
+                    "schema": schema,
+                    "strict": True
+                }
             }
+        )
+        if self.settings.llm_stream_responses:
+            return await self._stream_completion(completion_args)
+        
+        response = await self.openai_client.chat.completions.create(**completion_args)
+        return response.choices[0].message.content, response.usage
+    
+    def _fallback_assessment(self, change: ChangeDetail, change_velocity: str, reason: str) -> dict:
+        """Conservative assessment used when the LLM gives no usable result."""
+        return {
+            "risk_score": 0.5,
+            "risk_level": "medium",
+            "contributing_factors": [],
+            "blast_radius": [change.service],
+            "change_velocity": change_velocity,
+            "rollout_recommendation": "needs_human_review",
+            "confidence": 0.0,
+            "unknowns": ["Analysis error occurred"],
+            "refusal_reason": reason
+        }
+    
+    def _assessment_cache_key(
+        self,
+        change: ChangeDetail,
+        evidence: list[Evidence],
+        change_velocity: str,
+        request: AnalyzeChangeRequest
+    ) -> str:
+        """Fingerprint the inputs that determine the LLM assessment."""
+        payload = json.dumps({
+            "change_id": change.change_id,
+            "diff_summary": change.diff_summary,
+            "evidence_sources": sorted(e.source for e in evidence),
+            "change_velocity": change_velocity,
+            "focus_area": request.focus_area.value if request.focus_area else None,
+            "ignore_factors": sorted(request.ignore_factors),
+            "model": self.settings.chat_model
+        }, sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    
+    def _get_cached_assessment(self, key: str) -> Optional[dict]:
+        """Return a cached assessment if present and not expired."""
+        entry = self._assessment_cache.get(key)
+        if entry is None:
+            return None
+        
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.settings.llm_cache_ttl_seconds:
+            del self._assessment_cache[key]
+            return None
+        
+        self._assessment_cache.move_to_end(key)
+        return copy.deepcopy(result)
+    
+    def _store_cached_assessment(self, key: str, result: dict) -> None:
+        """Cache an assessment, evicting the least recently used entries."""
+        self._assessment_cache[key] = (time.monotonic(), copy.deepcopy(result))
+        self._assessment_cache.move_to_end(key)
+        while len(self._assessment_cache) > self.settings.llm_cache_max_entries:
+            self._assessment_cache.popitem(last=False)
+    
+    async def _stream_completion(self, completion_args: dict) -> tuple[str, object]:
+        """Stream a chat completion and return the assembled content and usage."""
+        stream = await self.openai_client.chat.completions.create(
+            **completion_args,
+            stream=True,
+            extra_body={"stream_options": {"include_usage": True}}
+        )
+        
+        parts = []
+        usage = None
+        async for chunk in stream:
+            # Usage arrives on a final chunk with no choices
+            usage = getattr(chunk, "usage", None) or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+        
+        return "".join(parts), usage
+    
+    def _usage_metadata(self, usage) -> dict:
+        """Extract prompt and prompt-cache token counts from completion usage."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        if isinstance(details, dict):
+            cached_tokens = details.get("cached_tokens")
+        else:
+            cached_tokens = getattr(details, "cached_tokens", None)
+        
+        return {
+            "prompt_tokens": getattr(usage, "prompt_tokens", None) or 0,
+            "cached_tokens": cached_tokens or 0
+        }
     
     def _build_assessment(
         self,
@@ -1,42 +1,153 @@
 """Change storage and management."""
 
-import json
+import asyncio
+import copy
+import sqlite3
+import threading
 import uuid
+from contextlib import closing
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 import logging
 
+import orjson
+
 from .config import get_settings
 from .models import (
-    ChangeStatus, ChangeSummary, ChangeDetail, Change,
-    AnalyzeChangeResponse, IngestChangeRequest, ChangeMetadata
+    ChangeStatus, ChangeSummary, ChangeDetail, Change, ChangeType, CHANGE_TYPE_VALUES,
+    AnalyzeChangeResponse, IngestChangeRequest, ChangeMetadata, RiskLevel
 )
 
 logger = logging.getLogger(__name__)
 
+_PENDING_STATUS = ChangeStatus.PENDING.value
+
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    change_id TEXT PRIMARY KEY,
+    service TEXT NOT NULL,
+    change_type TEXT NOT NULL,
+    version TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_risk_level TEXT,
+    last_risk_score REAL,
+    blob TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_changes_service_created
+    ON changes (service, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_changes_created
+    ON changes (created_at DESC);
+"""
+
+
+@lru_cache(maxsize=4096)
+def _parse_change_file(path: str, mtime_ns: int, size: int) -> dict:
+    """Parse a change file.
+    
+    Keyed on modification time and size, so rewriting the file invalidates
+    the entry. The returned dict is shared between callers and must not be
+    mutated.
+    """
+    return orjson.loads(Path(path).read_bytes())
+
 
 class ChangeStore:
-    """Manages change persistence using JSON files."""
+    """Manages change persistence using JSON files.
     
-    def __init__(self, changes_dir: Optional[str] = None):
+    When SQLite indexing is enabled, every write is mirrored into
+    ``changes.db`` so listings and per-service lookups are served by
+    indexed queries instead of scanning every JSON file. The JSON files
+    remain the source of truth for change details.
+    """
+    
+    def __init__(self, changes_dir: Optional[str] = None, use_sqlite: Optional[bool] = None):
         settings = get_settings()
         self.changes_dir = Path(changes_dir or settings.changes_directory)
         self.changes_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.use_sqlite = settings.changes_use_sqlite if use_sqlite is None else use_sqlite
+        self.db_path = self.changes_dir / "changes.db"
+        if self.use_sqlite:
+            self._init_index()
+        
+        # JSON-mode service index: service -> [(created_at, change_id)], plus
+        # change_id -> service for every file already seen (None if unreadable)
+        self._service_index: dict[str, list[tuple[str, str]]] = {}
+        self._indexed_services: dict[str, Optional[str]] = {}
+        self._service_index_lock = threading.RLock()
+        
+        # Total number of changes, counted once and kept current on create
+        self._change_count = self._count_changes()
+        self._count_lock = threading.Lock()
     
     def _change_path(self, change_id: str) -> Path:
         return self.changes_dir / f"{change_id}.json"
     
+    def _connect(self) -> sqlite3.Connection:
+        # Streamed listings may be resumed from different worker threads;
+        # each connection is still only used by one caller at a time
+        return sqlite3.connect(self.db_path, check_same_thread=False)
+    
+    def _init_index(self) -> None:
+        """Create the SQLite index and backfill changes missing from it."""
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(INDEX_SCHEMA)
+            indexed = {row[0] for row in conn.execute("SELECT change_id FROM changes")}
+        
+        missing = [p for p in self.changes_dir.glob("*.json") if p.stem not in indexed]
+        for change_file in missing:
+            try:
+                self._index_change(orjson.loads(change_file.read_bytes()))
+            except (orjson.JSONDecodeError, KeyError) as e:
+                logger.error(f"Error indexing change {change_file}: {e}")
+        
+        if missing:
+            logger.info(f"Indexed {len(missing)} existing changes into {self.db_path}")
+    
+    def _count_changes(self) -> int:
+        """Count stored changes without loading them."""
+        if self.use_sqlite:
+            with closing(self._connect()) as conn:
+                return conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+        return sum(1 for _ in self.changes_dir.glob("*.json"))
+    
+    def _index_change(self, change_data: dict) -> None:
+        """Upsert the listing columns and JSON blob for a change."""
+        assessment = (change_data.get("last_assessment") or {}).get("assessment", {})
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO changes "
+                "(change_id, service, change_type, version, status, created_at, "
+                "last_risk_level, last_risk_score, blob) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    change_data["change_id"],
+                    change_data["service"],
+                    change_data["change_type"],
+                    change_data.get("version"),
+                    change_data["status"],
+                    change_data["created_at"],
+                    assessment.get("risk_level"),
+                    assessment.get("risk_score"),
+                    orjson.dumps(change_data).decode()
+                )
+            )
+    
     def create_change(self, request: IngestChangeRequest) -> str:
         """Create a new change and return its ID."""
         change_id = str(uuid.uuid4())
+        change_type = CHANGE_TYPE_VALUES[request.change_type]
         
         change_data = {
             "change_id": change_id,
             "service": request.service,
-            "change_type": request.change_type.value,
+            "change_type": change_type,
             "version": request.version,
-            "status": ChangeStatus.PENDING.value,
+            "status": _PENDING_STATUS,
             "created_at": datetime.utcnow().isoformat(),
             "metadata": request.metadata.model_dump(),
             "diff_summary": request.diff_summary,
@@ -46,12 +157,26 @@ class ChangeStore:
             "assessment_history": []
         }
         
-        with open(self._change_path(change_id), 'w') as f:
-            json.dump(change_data, f, indent=2, default=str)
+        self._save_change(change_id, change_data)
+        self._add_to_service_index(change_data)
+        with self._count_lock:
+            self._change_count += 1
         
-        logger.info(f"Created change {change_id}: {request.service} {request.change_type.value}")
+        logger.info(f"Created change {change_id}: {request.service} {change_type}")
         return change_id
     
+    def count(self) -> int:
+        """Number of changes in the store.
+        
+        Counted once at startup and incremented on create, so changes
+        written by other processes are not reflected until restart.
+        """
+        return self._change_count
+    
+    async def acreate_change(self, request: IngestChangeRequest) -> str:
+        """Create a change without blocking the event loop."""
+        return await asyncio.to_thread(self.create_change, request)
+    
     def update_status(self, change_id: str, status: ChangeStatus) -> None:
         """Update change status."""
         change_data = self._load_change(change_id)
@@ -80,9 +205,13 @@ class ChangeStore:
             self._save_change(change_id, change_data)
             logger.info(f"Saved assessment for change {change_id}")
     
+    async def asave_assessment(self, change_id: str, assessment: AnalyzeChangeResponse) -> None:
+        """Save assessment results without blocking the event loop."""
+        await asyncio.to_thread(self.save_assessment, change_id, assessment)
+    
     def get_change(self, change_id: str) -> Optional[ChangeDetail]:
         """Get full change details."""
-        change_data = self._load_change(change_id)
+        change_data = self._load_change(change_id, writable=False)
         if not change_data:
             return None
         
@@ -103,14 +232,86 @@ class ChangeStore:
             last_assessment=last_assessment
         )
     
-    def list_changes(self, service: Optional[str] = None, risk_level: Optional[str] = None) -> list[ChangeSummary]:
-        """List all changes with optional filters."""
+    async def aget_change(self, change_id: str) -> Optional[ChangeDetail]:
+        """Get full change details without blocking the event loop."""
+        return await asyncio.to_thread(self.get_change, change_id)
+    
+    def list_changes(
+        self,
+        service: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> list[ChangeSummary]:
+        """List changes with optional filters, newest first."""
+        return list(self.iter_changes(service, risk_level, limit, offset))
+    
+    async def alist_changes(
+        self,
+        service: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> list[ChangeSummary]:
+        """List changes without blocking the event loop."""
+        return await asyncio.to_thread(self.list_changes, service, risk_level, limit, offset)
+    
+    def iter_changes(
+        self,
+        service: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Iterator[ChangeSummary]:
+        """Yield change summaries with optional filters, newest first.
+        
+        With the SQLite index, rows are read from the cursor as they are
+        consumed. The JSON fallback has to load every change to sort them.
+        """
+        if self.use_sqlite:
+            yield from self._iter_changes_indexed(service, risk_level, limit, offset)
+            return
+        
+        changes = self._scan_changes(service, risk_level)
+        end = None if limit is None else offset + limit
+        yield from changes[offset:end]
+    
+    def count_changes(self, service: Optional[str] = None, risk_level: Optional[str] = None) -> int:
+        """Number of changes matching the filters, ignoring paging."""
+        if not service and not risk_level:
+            return self.count()
+        if self.use_sqlite:
+            where, params = self._filter_clause(service, risk_level)
+            with closing(self._connect()) as conn:
+                return conn.execute("SELECT COUNT(*) FROM changes" + where, params).fetchone()[0]
+        return len(self._scan_changes(service, risk_level))
+    
+    async def acount_changes(self, service: Optional[str] = None, risk_level: Optional[str] = None) -> int:
+        """Count matching changes without blocking the event loop."""
+        return await asyncio.to_thread(self.count_changes, service, risk_level)
+    
+    @staticmethod
+    def _filter_clause(service: Optional[str], risk_level: Optional[str]) -> tuple[str, list]:
+        """Build the WHERE clause and parameters for the listing filters."""
+        clauses, params = [], []
+        if service:
+            clauses.append("service = ?")
+            params.append(service)
+        if risk_level:
+            # Unassessed changes are kept, matching the JSON scan
+            clauses.append("(last_risk_level IS NULL OR last_risk_level = ?)")
+            params.append(risk_level)
+        if not clauses:
+            return "", params
+        return " WHERE " + " AND ".join(clauses), params
+    
+    def _scan_changes(self, service: Optional[str], risk_level: Optional[str]) -> list[ChangeSummary]:
+        """List changes by reading every JSON file."""
         changes = []
         
         for change_file in self.changes_dir.glob("*.json"):
             try:
-                with open(change_file, 'r') as f:
-                    change_data = json.load(f)
+                change_data = self._read_change_file(change_file)
                 
                 # Apply filters
                 if service and change_data.get("service") != service:
@@ -136,7 +337,7 @@ class ChangeStore:
                     risk_level=last_risk_level,
                     risk_score=last_risk_score
                 ))
-            except (json.JSONDecodeError, KeyError) as e:
+            except (orjson.JSONDecodeError, KeyError) as e:
                 logger.error(f"Error loading change {change_file}: {e}")
                 continue
         
@@ -144,36 +345,122 @@ class ChangeStore:
         changes.sort(key=lambda x: x.created_at, reverse=True)
         return changes
     
+    def _iter_changes_indexed(
+        self,
+        service: Optional[str],
+        risk_level: Optional[str],
+        limit: Optional[int],
+        offset: int
+    ) -> Iterator[ChangeSummary]:
+        """Yield changes from the SQLite index."""
+        query = (
+            "SELECT change_id, service, change_type, version, status, created_at, "
+            "last_risk_level, last_risk_score FROM changes"
+        )
+        where, params = self._filter_clause(service, risk_level)
+        query += where + " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        
+        with closing(self._connect()) as conn:
+            # Rows were validated when written, so skip re-validating them here
+            for (change_id, row_service, change_type, version, status,
+                 created_at, last_risk_level, last_risk_score) in conn.execute(query, params):
+                yield ChangeSummary.model_construct(
+                    change_id=change_id,
+                    service=row_service,
+                    change_type=ChangeType(change_type),
+                    version=version,
+                    status=ChangeStatus(status),
+                    created_at=datetime.fromisoformat(created_at),
+                    risk_level=RiskLevel(last_risk_level) if last_risk_level else None,
+                    risk_score=last_risk_score
+                )
+    
     def change_exists(self, change_id: str) -> bool:
         """Check if a change exists."""
         return self._change_path(change_id).exists()
     
     def get_service_changes(self, service: str, limit: int = 10) -> list[dict]:
-        """Get recent changes for a service."""
+        """Get recent changes for a service.
+        
+        Returned dicts must be treated as read-only.
+        """
+        if self.use_sqlite:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT blob FROM changes WHERE service = ? ORDER BY created_at DESC LIMIT ?",
+                    (service, limit)
+                ).fetchall()
+            return [orjson.loads(blob) for (blob,) in rows]
+        
+        # Most recent first, then load only those files
+        with self._service_index_lock:
+            self._refresh_service_index()
+            entries = sorted(self._service_index.get(service, []), reverse=True)
         changes = []
-        for change_file in self.changes_dir.glob("*.json"):
-            try:
-                with open(change_file, 'r') as f:
-                    change_data = json.load(f)
-                if change_data.get("service") == service:
-                    changes.append(change_data)
-            except (json.JSONDecodeError, KeyError):
-                continue
+        for _, change_id in entries[:limit]:
+            change_data = self._load_change(change_id, writable=False)
+            if change_data:
+                changes.append(change_data)
+        return changes
+    
+    def _refresh_service_index(self) -> None:
+        """Sync the service index with the files on disk.
+        
+        Only file names are listed; files not seen before are parsed, so
+        changes written by other processes are picked up cheaply.
+        """
+        on_disk = {p.stem for p in self.changes_dir.glob("*.json")}
         
-        # Sort by created_at and limit
-        changes.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        return changes[:limit]
+        with self._service_index_lock:
+            for change_id in self._indexed_services.keys() - on_disk:
+                service = self._indexed_services.pop(change_id)
+                if service is not None:
+                    self._service_index[service] = [
+                        entry for entry in self._service_index[service] if entry[1] != change_id
+                    ]
+            
+            for change_id in on_disk - self._indexed_services.keys():
+                try:
+                    self._add_to_service_index(self._read_change_file(self._change_path(change_id)))
+                except (orjson.JSONDecodeError, KeyError, FileNotFoundError):
+                    self._indexed_services[change_id] = None
+    
+    def _add_to_service_index(self, change_data: dict) -> None:
+        """Record a change in the JSON-mode service index."""
+        change_id = change_data["change_id"]
+        with self._service_index_lock:
+            if change_id in self._indexed_services:
+                return
+            service = change_data["service"]
+            self._indexed_services[change_id] = service
+            self._service_index.setdefault(service, []).append(
+                (change_data.get("created_at", ""), change_id)
+            )
+    
+    def _read_change_file(self, path: Path) -> dict:
+        """Read a change file through the parse cache (read-only result)."""
+        stat = path.stat()
+        return _parse_change_file(str(path), stat.st_mtime_ns, stat.st_size)
     
-    def _load_change(self, change_id: str) -> Optional[dict]:
-        """Load change data from file."""
+    def _load_change(self, change_id: str, writable: bool = True) -> Optional[dict]:
+        """Load change data from file.
+        
+        Returns a private copy unless ``writable`` is False, in which case
+        the cached dict is returned and must not be modified.
+        """
         path = self._change_path(change_id)
         if not path.exists():
             return None
         
-        with open(path, 'r') as f:
-            return json.load(f)
+        change_data = self._read_change_file(path)
+        return copy.deepcopy(change_data) if writable else change_data
     
     def _save_change(self, change_id: str, change_data: dict) -> None:
-        """Save change data to file."""
-        with open(self._change_path(change_id), 'w') as f:
-            json.dump(change_data, f, indent=2, default=str)
+        """Save change data to file and mirror it into the index."""
+        self._change_path(change_id).write_bytes(
+            orjson.dumps(change_data, option=orjson.OPT_INDENT_2)
+        )
+        
+        if self.use_sqlite:
+            self._index_change(change_data)
@@ -15,27 +15,55 @@ class Settings(BaseSettings):
     embedding_model: str = "text-embedding-3-small"
     chat_model: str = "gpt-4o-mini"
     
+    # Embedding cache
+    embedding_cache_ttl_seconds: int = 3600
+    embedding_cache_max_entries: int = 10000
+    # float32, or float16 to halve cache memory at a small precision cost
+    embedding_cache_dtype: str = "float32"
+    
     # Analysis Configuration
     default_top_k: int = 10
     confidence_threshold: float = 0.6
     
+    # Stream chat completions instead of waiting for the full body
+    llm_stream_responses: bool = False
+    
+    # Max changes assessed per LLM call in batch analysis
+    llm_batch_max_changes: int = 10
+    
+    # LLM response cache
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_max_entries: int = 256
+    
     # Storage paths
     changes_directory: str = "./changes"
+    changes_use_sqlite: bool = True
     chroma_persist_directory: str = "./chroma_db"
+    hnsw_search_ef: int = 80
+    chroma_write_batch_window_ms: int = 50
     
     # Integration - Incident Investigator
     incident_service_url: str = "http://localhost:8003"
+    incident_list_cache_ttl_seconds: int = 60
+    incident_detail_cache_ttl_seconds: int = 300
+    incident_cache_max_entries: int = 512
+    incident_min_similarity: float = 0.35
+    incident_fetch_max_concurrency: int = 20
+    incident_index_max_per_request: int = 100
     
     # Server Configuration
     host: str = "0.0.0.0"
     port: int = 8004
+    # Event loop for uvicorn; "uvloop" (shipped with uvicorn[standard]) is
+    # recommended in production, "asyncio" is the stdlib fallback.
+    event_loop: str = "uvloop"
     
     class Config:
         env_file = ".env"
         extra = "ignore"
 
 
-@lru_cache()
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get cached settings instance."""
     return Settings()
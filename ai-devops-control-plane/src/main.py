@@ -8,18 +8,20 @@ This service provides deployment risk assessment:
 - Incident correlation
 """
 
+import asyncio
 import logging
 from typing import Optional
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from .config import get_settings
 from .models import (
     IngestChangeRequest, IngestChangeResponse, AnalyzeChangeRequest,
-    AnalyzeChangeResponse, RerunAnalysisRequest, ChangesListResponse,
-    ChangeDetail, ChangeStatus
+    AnalyzeChangeResponse, AnalyzeBatchRequest, AnalyzeBatchResponse,
+    RerunAnalysisRequest, ChangesListResponse, ChangeDetail, ChangeStatus,
+    CHANGE_TYPE_VALUES
 )
 from .change_store import ChangeStore
 from .vector_store import DevOpsVectorStore
@@ -49,19 +51,24 @@ async def lifespan(app: FastAPI):
     change_store = ChangeStore()
     vector_store = DevOpsVectorStore()
     analyzer = RiskAnalyzer(vector_store, change_store)
+    await analyzer.startup()
+    await vector_store.startup()
     
     logger.info(f"DevOps Control Plane initialized with model: {settings.chat_model}")
     
     yield
     
     logger.info("Shutting down AI DevOps Control Plane...")
+    await analyzer.shutdown()
+    await vector_store.shutdown()
 
 
 app = FastAPI(
     title="AI DevOps Control Plane",
     description="AI-powered DevOps system for deployment risk assessment and change impact analysis",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -78,7 +85,7 @@ app.add_middleware(
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle unexpected errors gracefully without leaking internals."""
     logger.error(f"Unhandled error on {request.url.path}: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "internal_server_error",
@@ -90,11 +97,10 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    changes = change_store.list_changes() if change_store else []
     return {
         "status": "healthy",
         "service": "ai-devops-control-plane",
-        "total_changes": len(changes)
+        "total_changes": change_store.count() if change_store else 0
     }
 
 
@@ -110,20 +116,22 @@ async def ingest_change(request: IngestChangeRequest):
     
     try:
         # Create change
-        change_id = change_store.create_change(request)
+        change_id = await change_store.acreate_change(request)
         
         # Index for similarity search
-        chunks_indexed = vector_store.index_change(
+        chunks_indexed = await vector_store.index_change(
             change_id=change_id,
             service=request.service,
-            change_type=request.change_type.value,
+            change_type=CHANGE_TYPE_VALUES[request.change_type],
             diff_summary=request.diff_summary,
             description=request.description
         )
         
         logger.info(f"Ingested change {change_id}: {request.service} ({chunks_indexed} chunks)")
         
-        return IngestChangeResponse(
+        # Every field comes from the validated request or the store, so
+        # model_construct is safe here and skips re-validation
+        return IngestChangeResponse.model_construct(
             change_id=change_id,
             service=request.service,
             change_type=request.change_type,
@@ -148,7 +156,7 @@ async def analyze_change(request: AnalyzeChangeRequest):
         raise HTTPException(status_code=503, detail="Service not initialized")
     
     # Get change
-    change = change_store.get_change(request.change_id)
+    change = await change_store.aget_change(request.change_id)
     if not change:
         raise HTTPException(status_code=404, detail="Change not found")
     
@@ -157,7 +165,7 @@ async def analyze_change(request: AnalyzeChangeRequest):
         result = await analyzer.analyze(change, request)
         
         # Save results
-        change_store.save_assessment(request.change_id, result)
+        await change_store.asave_assessment(request.change_id, result)
         
         logger.info(
             f"Analyzed change {request.change_id}: "
@@ -172,17 +180,72 @@ async def analyze_change(request: AnalyzeChangeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/changes/analyze/batch", response_model=AnalyzeBatchResponse)
+async def analyze_changes_batch(request: AnalyzeBatchRequest):
+    """
+    Analyze risk for several changes.
+    
+    Changes are assessed together in as few LLM calls as possible.
+    Strict mode applies to each change individually.
+    """
+    if not change_store or not analyzer:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+    
+    changes = await asyncio.gather(*(change_store.aget_change(cid) for cid in request.change_ids))
+    missing = [cid for cid, change in zip(request.change_ids, changes) if not change]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Changes not found: {', '.join(missing)}")
+    
+    try:
+        results = await analyzer.analyze_batch(list(changes), request)
+        
+        await asyncio.gather(*(
+            change_store.asave_assessment(result.change_id, result) for result in results
+        ))
+        
+        logger.info(f"Analyzed {len(results)} changes in batch")
+        
+        return AnalyzeBatchResponse(results=results, total_changes=len(results))
+        
+    except Exception as e:
+        logger.error(f"Batch analysis error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/changes", response_model=ChangesListResponse)
 async def list_changes(
+    request: Request,
     service: Optional[str] = Query(None, description="Filter by service"),
-    risk_level: Optional[str] = Query(None, description="Filter by risk level")
+    risk_level: Optional[str] = Query(None, description="Filter by risk level"),
+    limit: int = Query(100, ge=1, le=1000, description="Max changes to return"),
+    offset: int = Query(0, ge=0, description="Number of changes to skip")
 ):
-    """List all changes with optional filters."""
+    """
+    List changes with optional filters, newest first.
+    
+    ``total_changes`` counts every change matching the filters, so
+    clients can page through with ``limit`` and ``offset``.
+    
+    Send ``Accept: application/x-ndjson`` to stream one change summary
+    per line instead of a single JSON document.
+    """
     if not change_store:
         raise HTTPException(status_code=503, detail="Service not initialized")
     
-    changes = change_store.list_changes(service=service, risk_level=risk_level)
-    return ChangesListResponse(changes=changes, total_changes=len(changes))
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        summaries = change_store.iter_changes(service, risk_level, limit, offset)
+        return StreamingResponse(
+            (summary.model_dump_json() + "\n" for summary in summaries),
+            media_type="application/x-ndjson"
+        )
+    
+    changes, total_changes = await asyncio.gather(
+        change_store.alist_changes(
+            service=service, risk_level=risk_level, limit=limit, offset=offset
+        ),
+        change_store.acount_changes(service=service, risk_level=risk_level)
+    )
+    return ChangesListResponse(changes=changes, total_changes=total_changes)
 
 
 @app.get("/changes/{change_id}", response_model=ChangeDetail)
@@ -191,7 +254,7 @@ async def get_change(change_id: str):
     if not change_store:
         raise HTTPException(status_code=503, detail="Service not initialized")
     
-    change = change_store.get_change(change_id)
+    change = await change_store.aget_change(change_id)
     if not change:
         raise HTTPException(status_code=404, detail="Change not found")
     
@@ -208,7 +271,7 @@ async def rerun_analysis(change_id: str, request: RerunAnalysisRequest):
     if not change_store or not analyzer:
         raise HTTPException(status_code=503, detail="Service not initialized")
     
-    change = change_store.get_change(change_id)
+    change = await change_store.aget_change(change_id)
     if not change:
         raise HTTPException(status_code=404, detail="Change not found")
     
@@ -222,7 +285,7 @@ async def rerun_analysis(change_id: str, request: RerunAnalysisRequest):
     
     try:
         result = await analyzer.analyze(change, analyze_request)
-        change_store.save_assessment(change_id, result)
+        await change_store.asave_assessment(change_id, result)
         
         logger.info(f"Reran analysis for change {change_id}")
         
@@ -236,4 +299,4 @@ async def rerun_analysis(change_id: str, request: RerunAnalysisRequest):
 if __name__ == "__main__":
     import uvicorn
     settings = get_settings()
-    uvicorn.run(app, host=settings.host, port=settings.port)
+    uvicorn.run(app, host=settings.host, port=settings.port, loop=settings.event_loop)
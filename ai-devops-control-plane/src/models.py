@@ -15,6 +15,10 @@ class ChangeType(str, Enum):
     FEATURE_FLAG = "feature_flag"
 
 
+# Plain string values resolved once, for ingest paths that store or log them
+CHANGE_TYPE_VALUES = {change_type: change_type.value for change_type in ChangeType}
+
+
 class RiskLevel(str, Enum):
     """Risk level classification."""
     LOW = "low"
@@ -59,6 +63,9 @@ class ChangeMetadata(BaseModel):
     branch: Optional[str] = None
     pr_number: Optional[int] = None
     labels: list[str] = Field(default_factory=list)
+    
+    class Config:
+        frozen = True
 
 
 class Change(BaseModel):
@@ -114,6 +121,9 @@ class Evidence(BaseModel):
     excerpt: str
     relevance: float = Field(ge=0, le=1)
     source_type: str  # change_history, incident, config
+    
+    class Config:
+        frozen = True
 
 
 class ContributingFactor(BaseModel):
@@ -173,6 +183,28 @@ class AnalyzeChangeResponse(BaseModel):
     analysis_metadata: dict = Field(default_factory=dict)
 
 
+class AnalyzeBatchRequest(BaseModel):
+    """Request to analyze several changes together."""
+    change_ids: list[str] = Field(..., min_length=1, max_length=50)
+    strict_mode: bool = True
+    focus_area: Optional[FocusArea] = None
+    ignore_factors: list[str] = Field(default_factory=list)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "change_ids": ["abc-123", "def-456"],
+                "strict_mode": True
+            }
+        }
+
+
+class AnalyzeBatchResponse(BaseModel):
+    """Response from analyzing several changes."""
+    results: list[AnalyzeChangeResponse]
+    total_changes: int
+
+
 class RerunAnalysisRequest(BaseModel):
     """Request to rerun analysis with constraints."""
     strict_mode: bool = True
@@ -190,6 +222,9 @@ class ChangeSummary(BaseModel):
     created_at: datetime
     risk_level: Optional[RiskLevel] = None
     risk_score: Optional[float] = None
+    
+    class Config:
+        frozen = True
 
 
 class ChangeDetail(BaseModel):
@@ -204,6 +239,9 @@ class ChangeDetail(BaseModel):
     diff_summary: str
     related_incidents: list[str]
     last_assessment: Optional[AnalyzeChangeResponse] = None
+    
+    class Config:
+        frozen = True
 
 
 class ChangesListResponse(BaseModel):
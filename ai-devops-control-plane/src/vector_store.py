@@ -1,16 +1,69 @@
 """Vector store for change history and signals."""
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
-from openai import OpenAI
+from numba import njit
+from openai import AsyncOpenAI
+from collections import OrderedDict
+from datetime import datetime
 from typing import Optional
+import hashlib
+import asyncio
+import httpx
 import logging
+import os
+import time
 
 from .config import get_settings
-from .models import Evidence
+from .models import Evidence, SimilarIncident
 
 logger = logging.getLogger(__name__)
 
+# Most queued change writes combined into a single Chroma upsert
+WRITE_BATCH_MAX_ITEMS = 128
+
+# Most texts sent per embeddings call; the API rejects requests with more
+# than 2048 inputs
+EMBEDDING_BATCH_MAX_ITEMS = 256
+
+
+@njit(cache=True, boundscheck=False)
+def _chunk_boundaries(buf: np.ndarray, chunk_size: int, overlap: int) -> np.ndarray:
+    """Compute (start, end) offsets of overlapping chunks over a character buffer.
+    
+    A chunk ends after the last newline in its window when that newline is
+    past the window's midpoint, otherwise at the window's end.
+    """
+    length = len(buf)
+    newlines = np.flatnonzero(buf == 10)
+    
+    # Every chunk advances start by at least this much
+    step = max(chunk_size // 2 + 2 - overlap, 1)
+    offsets = np.empty((length // step + 2, 2), dtype=np.int64)
+    
+    count = 0
+    start = 0
+    while start < length:
+        end = start + chunk_size
+        
+        if end < length:
+            idx = np.searchsorted(newlines, end) - 1
+            if idx >= 0 and newlines[idx] - start > chunk_size // 2:
+                end = newlines[idx] + 1
+        
+        offsets[count, 0] = start
+        offsets[count, 1] = end
+        count += 1
+        start = end - overlap
+    
+    return offsets[:count]
+
+
+def _relevances(distances: list[float]) -> list[float]:
+    """Convert cosine distances to relevance scores clamped to [0, 1]."""
+    return np.round(np.clip(1.0 - np.asarray(distances, dtype=np.float64), 0.0, 1.0), 4).tolist()
+
 
 class DevOpsVectorStore:
     """Manages embeddings for change history and signals."""
@@ -20,10 +73,31 @@ class DevOpsVectorStore:
         
         self.persist_directory = persist_directory or settings.chroma_persist_directory
         self.embedding_model = settings.embedding_model
+        self.embedding_cache_ttl = settings.embedding_cache_ttl_seconds
+        self.embedding_cache_max_entries = settings.embedding_cache_max_entries
+        self.embedding_cache_dtype = np.dtype(settings.embedding_cache_dtype)
+        
+        # LRU of embeddings keyed by model and text, only touched from the
+        # event loop. Vectors are held as float32 (or float16) arrays rather
+        # than lists of boxed Python floats.
+        self._embedding_cache: OrderedDict[str, tuple[float, np.ndarray]] = OrderedDict()
         
-        self.openai_client = OpenAI(
+        # Change writes queued for the micro-batcher; None until startup()
+        self.write_batch_window = settings.chroma_write_batch_window_ms / 1000
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # Compile (or load the cached) chunker now rather than on first ingest
+        _chunk_boundaries(np.zeros(1, dtype=np.uint32), 500, 50)
+        
+        # Pooled keep-alive connections shared by all embedding requests
+        self.openai_client = AsyncOpenAI(
             api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base
+            base_url=settings.openai_api_base,
+            http_client=httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+            )
         )
         
         self.chroma_client = chromadb.Client(ChromaSettings(
@@ -32,51 +106,160 @@ class DevOpsVectorStore:
             persist_directory=self.persist_directory
         ))
         
-        # Single collection for all change history
+        # Single collection for all change history. Graph parameters only
+        # apply when the collection is first created.
         self.collection = self.chroma_client.get_or_create_collection(
             name="devops_changes",
+            metadata={
+                "hnsw:space": "cosine",
+                "hnsw:construction_ef": 200,
+                "hnsw:M": 32,
+                "hnsw:search_ef": settings.hnsw_search_ef,
+                "hnsw:num_threads": os.cpu_count() or 1
+            }
+        )
+        
+        # Incidents mirrored from the Incident Investigator, one entry per case
+        self.incident_collection = self.chroma_client.get_or_create_collection(
+            name="devops_incidents",
             metadata={"hnsw:space": "cosine"}
         )
     
-    def _get_embedding(self, text: str) -> list[float]:
+    async def startup(self) -> None:
+        """Start the background task that batches change writes."""
+        if self._flush_task is None:
+            self._write_queue = asyncio.Queue()
+            self._flush_task = asyncio.create_task(self._flush_writes())
+    
+    async def shutdown(self) -> None:
+        """Flush queued writes and close the pooled OpenAI client."""
+        if self._flush_task is not None:
+            await self._write_queue.put(None)
+            await self._flush_task
+            self._flush_task = None
+            self._write_queue = None
+        await self.openai_client.close()
+    
+    async def _flush_writes(self) -> None:
+        """Coalesce queued change writes into one upsert per batch window.
+        
+        Each queue item is (ids, embeddings, documents, metadatas, future).
+        A None item flushes what is pending and stops the task.
+        """
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._write_queue.get()
+            if item is None:
+                break
+            
+            batch = [item]
+            deadline = loop.time() + self.write_batch_window
+            while len(batch) < WRITE_BATCH_MAX_ITEMS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._write_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                await asyncio.to_thread(
+                    self.collection.upsert,
+                    ids=[i for ids, _, _, _, _ in batch for i in ids],
+                    embeddings=[e for _, embeddings, _, _, _ in batch for e in embeddings],
+                    documents=[d for _, _, documents, _, _ in batch for d in documents],
+                    metadatas=[m for _, _, _, metadatas, _ in batch for m in metadatas]
+                )
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+    
+    async def _get_embedding(self, text: str) -> list[float]:
         """Generate embedding for text."""
-        response = self.openai_client.embeddings.create(
-            model=self.embedding_model,
-            input=text[:8000]
-        )
-        return response.data[0].embedding
+        return (await self._get_embeddings_batch([text]))[0]
+    
+    async def _get_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for several texts in as few API calls as possible.
+        
+        Cached embeddings are reused; only the misses are sent to the API,
+        at most EMBEDDING_BATCH_MAX_ITEMS per call.
+        """
+        texts = [text[:8000] for text in texts]
+        keys = [self._embedding_cache_key(text) for text in texts]
+        embeddings = [self._get_cached_embedding(key) for key in keys]
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        for start in range(0, len(missing), EMBEDDING_BATCH_MAX_ITEMS):
+            batch = missing[start:start + EMBEDDING_BATCH_MAX_ITEMS]
+            response = await self.openai_client.embeddings.create(
+                model=self.embedding_model,
+                input=[texts[i] for i in batch]
+            )
+            for i, d in zip(batch, sorted(response.data, key=lambda d: d.index)):
+                embeddings[i] = d.embedding
+                self._store_cached_embedding(keys[i], d.embedding)
+        
+        return embeddings
+    
+    def _embedding_cache_key(self, text: str) -> str:
+        """Key an embedding by model and (truncated) input text."""
+        return hashlib.sha256(f"{self.embedding_model}:{text}".encode()).hexdigest()
+    
+    def _get_cached_embedding(self, key: str) -> Optional[list[float]]:
+        """Return a cached embedding if present and not expired."""
+        entry = self._embedding_cache.get(key)
+        if entry is None:
+            return None
+        
+        stored_at, embedding = entry
+        if time.monotonic() - stored_at > self.embedding_cache_ttl:
+            del self._embedding_cache[key]
+            return None
+        
+        self._embedding_cache.move_to_end(key)
+        return embedding.tolist()
+    
+    def _store_cached_embedding(self, key: str, embedding: list[float]) -> None:
+        """Cache an embedding, evicting the least recently used entries."""
+        self._embedding_cache[key] = (time.monotonic(), np.asarray(embedding, dtype=self.embedding_cache_dtype))
+        self._embedding_cache.move_to_end(key)
+        while len(self._embedding_cache) > self.embedding_cache_max_entries:
+            self._embedding_cache.popitem(last=False)
     
     def _chunk_content(self, content: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
         """Split content into overlapping chunks."""
         if len(content) <= chunk_size:
             return [content]
         
-        chunks = []
-        start = 0
-        while start < len(content):
-            end = start + chunk_size
-            chunk = content[start:end]
-            
-            if end < len(content):
-                last_newline = chunk.rfind('\n')
-                if last_newline > chunk_size // 2:
-                    chunk = chunk[:last_newline + 1]
-                    end = start + last_newline + 1
-            
-            chunks.append(chunk.strip())
-            start = end - overlap
+        # UTF-32 gives one code unit per character, so offsets match str indices
+        buf = np.frombuffer(content.encode("utf-32-le"), dtype=np.uint32)
+        offsets = _chunk_boundaries(buf, chunk_size, overlap)
         
+        chunks = [content[s:e].strip() for s, e in offsets.tolist()]
         return [c for c in chunks if c]
     
-    def index_change(self, change_id: str, service: str, change_type: str,
-                     diff_summary: str, description: Optional[str] = None) -> int:
+    async def index_change(self, change_id: str, service: str, change_type: str,
+                           diff_summary: str, description: Optional[str] = None) -> int:
         """Index a change for similarity search."""
         
-        # Combine content
-        content = f"Service: {service}\nChange Type: {change_type}\n"
+        # Similarity queries name the service and change type, and evidence
+        # excerpts are read without their metadata, so both stay in the text
+        parts = [f"Service: {service}", f"Change Type: {change_type}"]
         if description:
-            content += f"Description: {description}\n"
-        content += f"Diff Summary:\n{diff_summary}"
+            parts.append(f"Description: {description}")
+        parts.append(f"Diff Summary:\n{diff_summary}")
+        content = "\n".join(parts)
         
         chunks = self._chunk_content(content)
         
@@ -84,10 +267,7 @@ class DevOpsVectorStore:
             return 0
         
         # Generate embeddings
-        embeddings = []
-        for chunk in chunks:
-            embedding = self._get_embedding(chunk)
-            embeddings.append(embedding)
+        embeddings = await self._get_embeddings_batch(chunks)
         
         # Prepare data for ChromaDB
         ids = [f"{change_id}_{i}" for i in range(len(chunks))]
@@ -98,18 +278,24 @@ class DevOpsVectorStore:
             "chunk_index": i
         } for i in range(len(chunks))]
         
-        # Add to collection
-        self.collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=chunks,
-            metadatas=metadatas
-        )
+        # Add to collection, batched with concurrent ingests when running
+        if self._write_queue is not None:
+            future = asyncio.get_running_loop().create_future()
+            await self._write_queue.put((ids, embeddings, chunks, metadatas, future))
+            await future
+        else:
+            await asyncio.to_thread(
+                self.collection.add,
+                ids=ids,
+                embeddings=embeddings,
+                documents=chunks,
+                metadatas=metadatas
+            )
         
         logger.info(f"Indexed {len(chunks)} chunks for change {change_id}")
         return len(chunks)
     
-    def search_similar_changes(
+    async def search_similar_changes(
         self,
         query: str,
         service: Optional[str] = None,
@@ -118,50 +304,122 @@ class DevOpsVectorStore:
     ) -> list[Evidence]:
         """Search for similar past changes."""
         
-        query_embedding = self._get_embedding(query)
+        query_embedding = await self._get_embedding(query)
         
-        # Build where filter
-        where_filter = None
+        # Filter by service and drop the excluded change inside Chroma
+        conditions = []
         if service:
-            where_filter = {"service": service}
+            conditions.append({"service": service})
+        if exclude_change_id:
+            conditions.append({"change_id": {"$ne": exclude_change_id}})
+        if len(conditions) > 1:
+            where_filter = {"$and": conditions}
+        else:
+            where_filter = conditions[0] if conditions else None
         
-        results = self.collection.query(
+        results = await asyncio.to_thread(
+            self.collection.query,
             query_embeddings=[query_embedding],
-            n_results=top_k * 2,  # Get more to filter
+            n_results=top_k,
             include=["documents", "metadatas", "distances"],
             where=where_filter
         )
         
-        evidence_list = []
-        seen_changes = set()
+        # Results are sorted by distance, so the first chunk seen for a
+        # change is its best match
+        best_per_change: dict[str, tuple[float, str]] = {}
+        if results["ids"] and results["ids"][0]:
+            relevances = _relevances(results["distances"][0])
+            for metadata, relevance, document in zip(
+                results["metadatas"][0], relevances, results["documents"][0]
+            ):
+                best_per_change.setdefault(metadata.get("change_id", ""), (relevance, document))
+        
+        # Values are already normalized; skip validation on this hot path
+        evidence_list = [
+            Evidence.model_construct(
+                source=f"change:{change_id}",
+                excerpt=document[:300],
+                relevance=relevance,
+                source_type="change_history"
+            )
+            for change_id, (relevance, document) in best_per_change.items()
+        ]
+        
+        return evidence_list
+    
+    def get_indexed_incidents(self, case_ids: list[str]) -> dict[str, str]:
+        """Return the indexed analysis timestamp for each known case ID."""
+        if not case_ids:
+            return {}
+        
+        results = self.incident_collection.get(ids=case_ids, include=["metadatas"])
+        return {
+            case_id: metadata.get("last_analysis", "")
+            for case_id, metadata in zip(results["ids"], results["metadatas"])
+        }
+    
+    async def index_incidents(self, incidents: list[dict]) -> int:
+        """Upsert incidents (case_id, title, root_cause, created_at, last_analysis)."""
+        if not incidents:
+            return 0
+        
+        documents = [
+            f"Incident: {inc['title']}\nRoot cause: {inc.get('root_cause') or 'Unknown'}"
+            for inc in incidents
+        ]
+        embeddings = await self._get_embeddings_batch(documents)
+        await asyncio.to_thread(
+            self.incident_collection.upsert,
+            ids=[inc["case_id"] for inc in incidents],
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=[{
+                "case_id": inc["case_id"],
+                "title": inc["title"],
+                "root_cause": inc.get("root_cause") or "",
+                "created_at": inc.get("created_at") or "",
+                "last_analysis": inc.get("last_analysis") or ""
+            } for inc in incidents]
+        )
+        
+        logger.info(f"Indexed {len(incidents)} incidents")
+        return len(incidents)
+    
+    async def search_similar_incidents(
+        self,
+        query: str,
+        top_k: int = 5,
+        min_similarity: float = 0.0
+    ) -> list[SimilarIncident]:
+        """Search indexed incidents by embedding similarity."""
+        if await asyncio.to_thread(self.incident_collection.count) == 0:
+            return []
+        
+        query_embedding = await self._get_embedding(query)
+        results = await asyncio.to_thread(
+            self.incident_collection.query,
+            query_embeddings=[query_embedding],
+            n_results=top_k,
+            include=["metadatas", "distances"]
+        )
         
+        incidents = []
         if results["ids"] and results["ids"][0]:
-            for i, doc_id in enumerate(results["ids"][0]):
-                distance = results["distances"][0][i]
-                relevance = 1 - distance
-                
-                metadata = results["metadatas"][0][i]
-                change_id = metadata.get("change_id", "")
-                
-                # Skip excluded change and duplicates
-                if change_id == exclude_change_id:
-                    continue
-                if change_id in seen_changes:
+            similarities = _relevances(results["distances"][0])
+            for metadata, similarity in zip(results["metadatas"][0], similarities):
+                if similarity < min_similarity:
                     continue
                 
-                seen_changes.add(change_id)
-                
-                evidence_list.append(Evidence(
-                    source=f"change:{change_id}",
-                    excerpt=results["documents"][0][i][:300],
-                    relevance=round(max(0, min(1, relevance)), 4),
-                    source_type="change_history"
+                incidents.append(SimilarIncident(
+                    case_id=metadata["case_id"],
+                    title=metadata.get("title", ""),
+                    similarity_score=similarity,
+                    root_cause=metadata.get("root_cause") or None,
+                    occurred_at=datetime.fromisoformat(metadata["created_at"]) if metadata.get("created_at") else None
                 ))
-                
-                if len(evidence_list) >= top_k:
-                    break
         
-        return evidence_list
+        return incidents
     
     def get_chunk_count(self) -> int:
         """Get total indexed chunks."""
@@ -1,5 +1,6 @@
 """Tests for the risk analyzer."""
 
+import asyncio
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 from datetime import datetime
@@ -100,3 +101,102 @@ class TestStrictModeRefusal:
         # Non-strict mode always proceeds
         should_analyze = not strict_mode or evidence_count >= 2
         assert should_analyze is True
+
+
+class TestIncidentCache:
+    """Tests for the Incident Investigator response cache."""
+    
+    @pytest.fixture
+    def analyzer(self):
+        """Create an analyzer with mocked stores and a small incident cache."""
+        pytest.importorskip("chromadb")
+        pytest.importorskip("numba")
+        from src.analyzer import RiskAnalyzer
+        
+        analyzer = RiskAnalyzer(MagicMock(), MagicMock())
+        analyzer.settings = analyzer.settings.model_copy(
+            update={"incident_cache_max_entries": 2}
+        )
+        return analyzer
+    
+    def test_cache_evicts_least_recently_used(self, analyzer):
+        """Test that the cache stays bounded and keeps recently read entries."""
+        analyzer._cache_incidents("case:a", {"case_id": "a"})
+        analyzer._cache_incidents("case:b", {"case_id": "b"})
+        assert analyzer._get_cached_incidents("case:a", 300) == {"case_id": "a"}
+        
+        analyzer._cache_incidents("case:c", {"case_id": "c"})
+        
+        assert len(analyzer._incident_cache) == 2
+        assert analyzer._get_cached_incidents("case:b", 300) is None
+        assert analyzer._get_cached_incidents("case:a", 300) == {"case_id": "a"}
+        assert analyzer._get_cached_incidents("case:c", 300) == {"case_id": "c"}
+
+
+class TestIncidentIndexing:
+    """Tests for indexing incidents from the Incident Investigator."""
+    
+    @pytest.fixture
+    def analyzer(self):
+        """Create an analyzer with mocked stores and small incident limits."""
+        pytest.importorskip("chromadb")
+        pytest.importorskip("numba")
+        from src.analyzer import RiskAnalyzer
+        
+        analyzer = RiskAnalyzer(MagicMock(), MagicMock())
+        analyzer.settings = analyzer.settings.model_copy(
+            update={"incident_index_max_per_request": 3}
+        )
+        analyzer._incident_fetch_semaphore = asyncio.Semaphore(2)
+        return analyzer
+    
+    async def test_indexing_limited_per_request(self, analyzer):
+        """Test that one analysis indexes at most the configured number of cases."""
+        analyzer.vector_store.get_indexed_incidents.return_value = {}
+        analyzer.vector_store.index_incidents = AsyncMock()
+        analyzer.vector_store.search_similar_incidents = AsyncMock(return_value=[])
+        analyzer._fetch_case_details = AsyncMock(return_value={})
+        cases = [{"case_id": f"case-{i}", "title": "DB outage"} for i in range(10)]
+        
+        await analyzer._search_incidents_by_vector(MagicMock(), cases)
+        
+        assert len(analyzer._fetch_case_details.call_args.args[0]) == 3
+        assert len(analyzer.vector_store.index_incidents.call_args.args[0]) == 3
+    
+    async def test_case_fetches_bounded(self, analyzer):
+        """Test that case detail requests in flight stay under the limit."""
+        in_flight = peak = 0
+        
+        async def get(url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return MagicMock(status_code=404)
+        
+        analyzer._http = MagicMock(get=get)
+        
+        details = await analyzer._fetch_case_details([f"case-{i}" for i in range(10)])
+        
+        assert len(details) == 10
+        assert peak == 2
+
+
+class TestTruncateExcerpt:
+    """Tests for evidence excerpt truncation."""
+    
+    def test_truncate_respects_max_excerpt(self):
+        """Test that truncated excerpts never exceed MAX_EXCERPT."""
+        pytest.importorskip("chromadb")
+        pytest.importorskip("numba")
+        from src.analyzer import MAX_EXCERPT, _truncate_excerpt
+        
+        short = "x" * MAX_EXCERPT
+        assert _truncate_excerpt(short) == short
+        
+        truncated = _truncate_excerpt("head" + "x" * 2000 + "tail")
+        assert len(truncated) <= MAX_EXCERPT
+        assert truncated.startswith("head")
+        assert truncated.endswith("tail")
+        assert " ... " in truncated
@@ -104,3 +104,101 @@ class TestChangeStore:
         
         changes = store.get_service_changes("order-service")
         assert len(changes) == 2
+    
+    def test_index_backfills_existing_changes(self, temp_dir, sample_request):
+        """Test that changes written without the index are picked up on startup."""
+        json_store = ChangeStore(changes_dir=temp_dir, use_sqlite=False)
+        change_id = json_store.create_change(sample_request)
+        
+        indexed_store = ChangeStore(changes_dir=temp_dir, use_sqlite=True)
+        changes = indexed_store.list_changes()
+        assert [c.change_id for c in changes] == [change_id]
+        assert len(indexed_store.get_service_changes("order-service")) == 1
+    
+    def test_index_matches_json_scan(self, temp_dir, sample_request):
+        """Test that indexed listings match the JSON file scan."""
+        store = ChangeStore(changes_dir=temp_dir, use_sqlite=True)
+        store.create_change(sample_request)
+        store.create_change(IngestChangeRequest(
+            change_type=ChangeType.CONFIG,
+            service="api-gateway",
+            diff_summary="Timeout changes"
+        ))
+        json_store = ChangeStore(changes_dir=temp_dir, use_sqlite=False)
+        
+        for service in (None, "order-service", "api-gateway"):
+            indexed = store.list_changes(service=service)
+            scanned = json_store.list_changes(service=service)
+            assert [c.change_id for c in indexed] == [c.change_id for c in scanned]
+    
+    def test_cached_reads_see_updates(self, temp_dir, sample_request):
+        """Test that the parse cache is invalidated when a change is rewritten."""
+        store = ChangeStore(changes_dir=temp_dir, use_sqlite=False)
+        change_id = store.create_change(sample_request)
+        
+        assert store.list_changes()[0].status == ChangeStatus.PENDING
+        store.update_status(change_id, ChangeStatus.DEPLOYED)
+        
+        assert store.list_changes()[0].status == ChangeStatus.DEPLOYED
+        assert store.get_change(change_id).status == ChangeStatus.DEPLOYED
+    
+    def test_service_index_sees_external_changes(self, temp_dir, sample_request):
+        """Test that the JSON service index picks up changes written by another store."""
+        store = ChangeStore(changes_dir=temp_dir, use_sqlite=False)
+        store.create_change(sample_request)
+        assert len(store.get_service_changes("order-service")) == 1
+        
+        other = ChangeStore(changes_dir=temp_dir, use_sqlite=False)
+        other.create_change(sample_request)
+        store.create_change(sample_request)
+        
+        assert len(store.get_service_changes("order-service")) == 3
+        assert len(store.get_service_changes("order-service", limit=2)) == 2
+        assert store.get_service_changes("api-gateway") == []
+    
+    @pytest.mark.parametrize("use_sqlite", [True, False])
+    def test_list_changes_pagination(self, temp_dir, sample_request, use_sqlite):
+        """Test limit/offset paging and streaming iteration."""
+        store = ChangeStore(changes_dir=temp_dir, use_sqlite=use_sqlite)
+        for _ in range(5):
+            store.create_change(sample_request)
+        
+        all_ids = [c.change_id for c in store.list_changes()]
+        assert [c.change_id for c in store.list_changes(limit=2, offset=1)] == all_ids[1:3]
+        assert [c.change_id for c in store.list_changes(offset=4)] == all_ids[4:]
+        assert [c.change_id for c in store.iter_changes(limit=3)] == all_ids[:3]
+    
+    @pytest.mark.parametrize("use_sqlite", [True, False])
+    def test_count_changes_ignores_paging(self, temp_dir, sample_request, use_sqlite):
+        """Test that filtered counts cover every match, not one page."""
+        store = ChangeStore(changes_dir=temp_dir, use_sqlite=use_sqlite)
+        for _ in range(3):
+            store.create_change(sample_request)
+        store.create_change(sample_request.model_copy(update={"service": "api-gateway"}))
+        
+        assert store.count_changes() == 4
+        assert store.count_changes(service="order-service") == 3
+        assert store.count_changes(service="billing") == 0
+        assert store.count_changes(risk_level="high") == 4
+    
+    def test_count(self, temp_dir, sample_request):
+        """Test that the cached count tracks created and existing changes."""
+        store = ChangeStore(changes_dir=temp_dir)
+        assert store.count() == 0
+        
+        store.create_change(sample_request)
+        store.create_change(sample_request)
+        assert store.count() == 2
+        
+        assert ChangeStore(changes_dir=temp_dir).count() == 2
+        assert ChangeStore(changes_dir=temp_dir, use_sqlite=False).count() == 2
+    
+    async def test_async_wrappers(self, store, sample_request):
+        """Test the event-loop friendly wrappers."""
+        change_id = await store.acreate_change(sample_request)
+        
+        change = await store.aget_change(change_id)
+        assert change.change_id == change_id
+        
+        changes = await store.alist_changes(service="order-service")
+        assert [c.change_id for c in changes] == [change_id]
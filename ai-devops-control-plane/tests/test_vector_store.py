@@ -0,0 +1,66 @@
+"""Tests for the change vector store."""
+
+import pytest
+import tempfile
+import shutil
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+pytest.importorskip("chromadb")
+pytest.importorskip("numba")
+
+from src.vector_store import DevOpsVectorStore, EMBEDDING_BATCH_MAX_ITEMS
+
+
+class TestDevOpsVectorStore:
+    """Test suite for DevOpsVectorStore."""
+    
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory for the Chroma index."""
+        temp_path = tempfile.mkdtemp()
+        yield temp_path
+        shutil.rmtree(temp_path)
+    
+    async def test_construct(self, temp_dir):
+        """Test that the store builds its collections and shuts down cleanly."""
+        store = DevOpsVectorStore(persist_directory=temp_dir)
+        
+        assert store.collection.metadata["hnsw:space"] == "cosine"
+        assert store.collection.metadata["hnsw:num_threads"] >= 1
+        assert store.get_chunk_count() == 0
+        
+        await store.startup()
+        await store.shutdown()
+    
+    def test_chunk_content(self, temp_dir):
+        """Test that long content is split into bounded, overlapping chunks."""
+        store = DevOpsVectorStore(persist_directory=temp_dir)
+        content = "\n".join(f"line {i}: " + "x" * 40 for i in range(100))
+        
+        chunks = store._chunk_content(content)
+        
+        assert len(chunks) > 1
+        assert all(len(c) <= 500 for c in chunks)
+        assert chunks[0].startswith("line 0:")
+    
+    async def test_embeddings_batched(self, temp_dir):
+        """Test that many uncached texts are embedded in bounded API calls."""
+        store = DevOpsVectorStore(persist_directory=temp_dir)
+        batch_sizes = []
+        
+        def create(model, input):
+            batch_sizes.append(len(input))
+            return SimpleNamespace(data=[
+                SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)
+            ])
+        
+        store.openai_client = MagicMock()
+        store.openai_client.embeddings.create = AsyncMock(side_effect=create)
+        texts = [f"incident {i}" for i in range(600)]
+        
+        embeddings = await store._get_embeddings_batch(texts)
+        
+        assert max(batch_sizes) <= EMBEDDING_BATCH_MAX_ITEMS
+        assert sum(batch_sizes) == 600
+        assert embeddings == [[float(len(text))] for text in texts]
@@ -1,20 +1,79 @@
 """Core incident analysis engine."""
 
+import asyncio
+import copy
+import hashlib
+import heapq
 import json
 import logging
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from openai import OpenAI
+from itertools import islice
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+import httpx
+from openai import AsyncOpenAI
 
 from .config import get_settings
 from .models import (
-    AnalyzeRequest, AnalyzeResponse, Hypothesis, TimelineEvent,
-    WhatChanged, Evidence, ArtifactType, Artifact
+    AnalyzeRequest, AnalyzeResponse, AnalyzeBatchRequest, Hypothesis, TimelineEvent,
+    WhatChanged, Evidence, ArtifactType, Artifact, CaseDetail
 )
-from .vector_store import IncidentVectorStore
+from .vector_store import IncidentVectorStore, get_encoding
 from .parsers import parse_artifact, extract_what_changed
 
 logger = logging.getLogger(__name__)
 
+# Retrieval terms appended to the search query for each focus area
+FOCUS_TERMS = {
+    "database": "database connection pool query timeout deadlock",
+    "auth": "authentication authorization token jwt session login",
+    "network": "network connection timeout dns latency packet",
+    "deployment": "deploy release version rollback container image",
+    "performance": "latency response time memory cpu throughput"
+}
+
+# Timeline events kept per analysis; responses and prompts only use the earliest
+MAX_TIMELINE_EVENTS = 30
+
+
+def _event_time(event: TimelineEvent) -> datetime:
+    """Sort key placing events without a timestamp first."""
+    return event.timestamp or datetime.min
+
+
+@lru_cache(maxsize=1024)
+def _format_timeline(entries: tuple[tuple[str, str, str], ...]) -> str:
+    """Format (timestamp, kind, title) entries as prompt timeline lines.
+    
+    Re-analyses of a case (other focus areas, reruns) reuse the formatted text.
+    """
+    return "\n".join(f"- [{timestamp}] {kind}: {title}" for timestamp, kind, title in entries)
+
+
+def _warm_parse_worker() -> None:
+    """No-op run once per parser process so it imports this module at startup."""
+
+
+def _earliest_events(artifact: Artifact) -> list[TimelineEvent]:
+    """Parse an artifact and return its earliest events in timeline order.
+    
+    Runs on the parser processes, so only the events that can reach the
+    timeline are sent back. Ties keep parse order.
+    """
+    # Decorate with (timestamp, position) so the key is computed once per
+    # event rather than per comparison
+    keyed_events = [
+        (_event_time(event), position, event)
+        for position, event in enumerate(parse_artifact(artifact))
+    ]
+    return [event for _, _, event in heapq.nsmallest(MAX_TIMELINE_EVENTS, keyed_events)]
+
 
 ANALYSIS_SYSTEM_PROMPT = """You are an expert Site Reliability Engineer conducting incident root cause analysis.
 
@@ -67,186 +126,562 @@ class IncidentAnalyzer:
         self.vector_store = vector_store
         self.settings = get_settings()
         
-        self.openai_client = OpenAI(
+        # One pooled client for every analysis; connections are kept alive
+        # between requests instead of paying a TLS handshake per completion
+        self.openai_client = AsyncOpenAI(
             api_key=self.settings.openai_api_key,
-            base_url=self.settings.openai_api_base
+            base_url=self.settings.openai_api_base,
+            http_client=httpx.AsyncClient(
+                timeout=120.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
         )
+        
+        # prompt fingerprint -> (stored_at, LLM result), least recently used first
+        self._hypothesis_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._hypothesis_cache_hits = 0
+        self._hypothesis_cache_misses = 0
+        
+        # case_id -> (timeline events, detected changes), least recently used
+        # first; artifacts never change after ingest, so entries stay valid
+        self._parse_cache: OrderedDict[str, tuple[list[TimelineEvent], list[dict]]] = OrderedDict()
+        self._parse_cache_lock = threading.Lock()
+        
+        # Parsing is pure-Python regex work that holds the GIL, so artifacts
+        # are spread over worker processes rather than threads. Workers come
+        # from a forkserver so they never inherit locks held by the server's
+        # threads, and are started now rather than on the first request.
+        # Windows has no forkserver; its default start method spawns.
+        self._parse_executor = None
+        if self.settings.parse_workers > 1:
+            start_method = (
+                "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+            )
+            self._parse_executor = ProcessPoolExecutor(
+                max_workers=self.settings.parse_workers,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+            for _ in range(self.settings.parse_workers):
+                self._parse_executor.submit(_warm_parse_worker)
+    
+    async def shutdown(self) -> None:
+        """Close the OpenAI client and stop the parser processes."""
+        await self.openai_client.close()
+        if self._parse_executor:
+            self._parse_executor.shutdown(cancel_futures=True)
     
-    def analyze(
+    def get_cache_stats(self) -> dict:
+        """Report entry counts and hit/miss totals for the analysis caches."""
+        return {
+            "query_embeddings": self.vector_store.get_embedding_cache_stats(),
+            "parsed_cases": {"entries": len(self._parse_cache)},
+            "hypotheses": {
+                "entries": len(self._hypothesis_cache),
+                "hits": self._hypothesis_cache_hits,
+                "misses": self._hypothesis_cache_misses
+            }
+        }
+    
+    async def analyze(
         self,
         case_id: str,
         incident_summary: str,
         artifacts: list[Artifact],
         request: AnalyzeRequest
     ) -> AnalyzeResponse:
-        """Perform full incident analysis."""
-        
-        # Step 1: Parse artifacts for timeline events
-        all_events = []
-        for artifact in artifacts:
-            events = parse_artifact(artifact)
-            all_events.extend(events)
-        
-        # Sort events by timestamp
-        all_events.sort(key=lambda e: e.timestamp or datetime.min)
-        
-        # Step 2: Extract what changed
-        changes_raw = extract_what_changed(artifacts)
+        """Perform full incident analysis.
         
-        # Step 3: Build query for evidence retrieval
-        focus_query = self._build_search_query(incident_summary, request.focus_area)
+        Artifact parsing and evidence retrieval are independent, so they run
+        concurrently in worker threads; analyses of several cases can be
+        awaited together with asyncio.gather.
+        """
         
-        # Step 4: Retrieve relevant evidence
-        evidence = self.vector_store.search(
-            case_id=case_id,
-            query=focus_query,
-            top_k=request.top_k,
-            exclude_sources=getattr(request, 'exclude_sources', None) or []
-        )
+        # Steps 1-4: Parse timeline and changes while retrieving evidence
+        context = await self._gather_context(case_id, incident_summary, artifacts, request)
         
         # Step 5: Check if we have enough evidence
-        avg_relevance = sum(e.relevance for e in evidence) / len(evidence) if evidence else 0
-        
-        if request.strict_mode and (len(evidence) < 2 or avg_relevance < self.settings.confidence_threshold):
-            return AnalyzeResponse(
-                case_id=case_id,
-                timeline_events=all_events[:20],  # Limit for response size
-                hypotheses=[],
-                what_changed=[],
-                recommended_next_steps=[
-                    "Collect more detailed logs around the incident timeframe",
-                    "Gather deploy history for the 24 hours before incident",
-                    "Check monitoring dashboards for anomalies",
-                    "Interview on-call engineers who responded"
-                ],
-                confidence_overall=avg_relevance,
-                refusal_reason="I don't have enough evidence in the provided artifacts to determine a root cause. The evidence relevance is too low for confident analysis.",
-                analysis_metadata={
-                    "evidence_count": len(evidence),
-                    "avg_relevance": round(avg_relevance, 4),
-                    "strict_mode": True
-                }
-            )
+        if request.strict_mode and self._insufficient_evidence(context):
+            return self._strict_refusal(case_id, context)
         
         # Step 6: Generate hypotheses with LLM
-        llm_result = self._generate_hypotheses(
+        llm_result, cache_hit = await self._generate_hypotheses(
             incident_summary=incident_summary,
-            evidence=evidence,
-            changes_raw=changes_raw,
-            timeline_summary=self._summarize_timeline(all_events),
+            context=context,
             request=request
         )
         
         # Step 7: Build response
+        return self._build_response(case_id, request, context, llm_result, {"cache_hit": cache_hit})
+    
+    async def analyze_stream(
+        self,
+        case_id: str,
+        incident_summary: str,
+        artifacts: list[Artifact],
+        request: AnalyzeRequest
+    ) -> AsyncIterator[tuple[str, object]]:
+        """Perform incident analysis, yielding progress as it becomes available.
+        
+        Yields ("timeline", events) once artifacts are parsed, then
+        ("delta", text) for each fragment of the LLM's JSON as it streams,
+        and finally ("result", AnalyzeResponse) - the same response analyze()
+        returns. Strict mode refusals and cached results skip the deltas.
+        """
+        context = await self._gather_context(case_id, incident_summary, artifacts, request)
+        yield "timeline", context["timeline_events"]
+        
+        if request.strict_mode and self._insufficient_evidence(context):
+            yield "result", self._strict_refusal(case_id, context)
+            return
+        
+        user_prompt = self._hypothesis_prompt(incident_summary, context, request)
+        cache_key = self._hypothesis_cache_key(user_prompt)
+        llm_result = self._get_cached_hypotheses(cache_key)
+        cache_hit = llm_result is not None
+        
+        if not cache_hit:
+            parts = []
+            try:
+                stream = await self.openai_client.chat.completions.create(
+                    **self._completion_args(user_prompt),
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield "delta", parts[-1]
+                
+                llm_result = json.loads("".join(parts) or "{}")
+                self._store_cached_hypotheses(cache_key, llm_result)
+                
+            except Exception as e:
+                logger.error(f"LLM generation error: {e}")
+                llm_result = self._fallback_result(f"Analysis error: {str(e)}")
+        
+        yield "result", self._build_response(case_id, request, context, llm_result, {"cache_hit": cache_hit})
+    
+    async def analyze_batch(
+        self,
+        cases: list[CaseDetail],
+        request: AnalyzeBatchRequest
+    ) -> list[AnalyzeResponse]:
+        """Analyze several cases, sharing LLM calls between them.
+        
+        Evidence retrieval runs concurrently for all cases. Cases that are
+        not refused by strict mode or served from the hypothesis cache are
+        analyzed in groups of up to ``llm_batch_max_cases`` per LLM call.
+        Constraints come from the single request, so every group shares the
+        same focus area and hypothesis count.
+        """
+        contexts = await asyncio.gather(*(
+            self._gather_context(case.case_id, case.incident_summary, case.artifacts, request)
+            for case in cases
+        ))
+        
+        results: list[Optional[AnalyzeResponse]] = [None] * len(cases)
+        pending = []  # (position, cache key)
+        for i, (case, context) in enumerate(zip(cases, contexts)):
+            if request.strict_mode and self._insufficient_evidence(context):
+                results[i] = self._strict_refusal(case.case_id, context)
+                continue
+            
+            cache_key = self._hypothesis_cache_key(
+                self._hypothesis_prompt(case.incident_summary, context, request)
+            )
+            cached = self._get_cached_hypotheses(cache_key)
+            if cached is not None:
+                results[i] = self._build_response(case.case_id, request, context, cached, {"cache_hit": True})
+            else:
+                pending.append((i, cache_key))
+        
+        batch_size = self.settings.llm_batch_max_cases
+        groups = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        batch_outputs = await asyncio.gather(*(
+            self._generate_hypotheses_batch(
+                [(cases[i].incident_summary, contexts[i]) for i, _ in group],
+                request
+            )
+            for group in groups
+        ))
+        
+        for group, llm_results in zip(groups, batch_outputs):
+            for (i, cache_key), llm_result in zip(group, llm_results):
+                if llm_result.pop("_from_llm", False):
+                    self._store_cached_hypotheses(cache_key, llm_result)
+                results[i] = self._build_response(
+                    cases[i].case_id, request, contexts[i], llm_result,
+                    {"cache_hit": False, "batch_size": len(group)}
+                )
+        
+        return results
+    
+    async def _gather_context(
+        self,
+        case_id: str,
+        incident_summary: str,
+        artifacts: list[Artifact],
+        request: AnalyzeRequest | AnalyzeBatchRequest
+    ) -> dict:
+        """Parse a case's artifacts and retrieve its evidence."""
+        focus_query = self._build_search_query(incident_summary, request.focus_area)
+        
+        (timeline_events, changes_raw), evidence = await asyncio.gather(
+            asyncio.to_thread(self.parse_case, case_id, artifacts),
+            asyncio.to_thread(
+                self.vector_store.search,
+                case_id=case_id,
+                query=focus_query,
+                top_k=request.top_k,
+                exclude_sources=getattr(request, 'exclude_sources', None) or [],
+                start_time=getattr(request, 'start_time', None),
+                end_time=getattr(request, 'end_time', None)
+            )
+        )
+        
+        prompt_evidence, prompt_excerpts = self._fit_evidence(evidence)
+        
+        return {
+            "timeline_events": timeline_events,
+            "changes_raw": changes_raw,
+            "evidence": evidence,
+            "prompt_evidence": prompt_evidence,
+            "prompt_excerpts": prompt_excerpts,
+            "evidence_dropped": len(evidence) - len(prompt_evidence),
+            "avg_relevance": sum(e.relevance for e in evidence) / len(evidence) if evidence else 0
+        }
+    
+    def _fit_evidence(self, evidence: list[Evidence]) -> tuple[list[Evidence], list[str]]:
+        """Fit evidence into the prompt token budget.
+        
+        Walks evidence from most to least relevant, truncating each excerpt
+        to ``evidence_excerpt_max_tokens`` and stopping once the total
+        reaches ``evidence_prompt_max_tokens``. Returns the kept evidence,
+        which defines the indices the LLM cites, and the prompt excerpts.
+        """
+        encoding = get_encoding(self.settings.chat_model)
+        excerpt_limit = self.settings.evidence_excerpt_max_tokens
+        budget = self.settings.evidence_prompt_max_tokens
+        
+        kept, excerpts = [], []
+        used = 0
+        for ev in sorted(evidence, key=lambda e: e.relevance, reverse=True):
+            tokens = encoding.encode(ev.excerpt, disallowed_special=())
+            if len(tokens) > excerpt_limit:
+                tokens = tokens[:excerpt_limit]
+                excerpt = encoding.decode(tokens) + " ..."
+            else:
+                excerpt = ev.excerpt
+            
+            if kept and used + len(tokens) > budget:
+                break
+            used += len(tokens)
+            kept.append(ev)
+            excerpts.append(excerpt)
+        
+        return kept, excerpts
+    
+    def _insufficient_evidence(self, context: dict) -> bool:
+        """Whether strict mode should refuse to generate hypotheses.
+        
+        Judged on all retrieved evidence, so the outcome does not depend
+        on how much of it fits the prompt budget.
+        """
+        return (
+            len(context["evidence"]) < 2
+            or context["avg_relevance"] < self.settings.confidence_threshold
+        )
+    
+    def _strict_refusal(self, case_id: str, context: dict) -> AnalyzeResponse:
+        """Build the strict mode response for weak evidence."""
+        return AnalyzeResponse(
+            case_id=case_id,
+            timeline_events=context["timeline_events"][:20],  # Limit for response size
+            hypotheses=[],
+            what_changed=[],
+            recommended_next_steps=[
+                "Collect more detailed logs around the incident timeframe",
+                "Gather deploy history for the 24 hours before incident",
+                "Check monitoring dashboards for anomalies",
+                "Interview on-call engineers who responded"
+            ],
+            confidence_overall=context["avg_relevance"],
+            refusal_reason="I don't have enough evidence in the provided artifacts to determine a root cause. The evidence relevance is too low for confident analysis.",
+            analysis_metadata={
+                "evidence_count": len(context["evidence"]),
+                "avg_relevance": round(context["avg_relevance"], 4),
+                "strict_mode": True
+            }
+        )
+    
+    def _build_response(
+        self,
+        case_id: str,
+        request: AnalyzeRequest | AnalyzeBatchRequest,
+        context: dict,
+        llm_result: dict,
+        extra_metadata: dict
+    ) -> AnalyzeResponse:
+        """Build the analysis response from the LLM result."""
+        evidence = context["prompt_evidence"]
         hypotheses = self._build_hypotheses(llm_result.get("hypotheses", []), evidence)
         what_changed = self._build_what_changed(llm_result.get("what_changed", []), evidence)
         
         return AnalyzeResponse(
             case_id=case_id,
-            timeline_events=all_events[:30],
+            timeline_events=context["timeline_events"],
             hypotheses=hypotheses,
             what_changed=what_changed,
             recommended_next_steps=llm_result.get("recommended_next_steps", []),
-            confidence_overall=llm_result.get("confidence_overall", avg_relevance),
+            confidence_overall=llm_result.get("confidence_overall", context["avg_relevance"]),
             refusal_reason=llm_result.get("refusal_reason"),
             analysis_metadata={
-                "evidence_count": len(evidence),
-                "avg_relevance": round(avg_relevance, 4),
+                "evidence_count": len(context["evidence"]),
+                "avg_relevance": round(context["avg_relevance"], 4),
+                "evidence_dropped": context["evidence_dropped"],
                 "strict_mode": request.strict_mode,
-                "model": self.settings.chat_model
+                "model": self.settings.chat_model,
+                **extra_metadata
             }
         )
     
+    def parse_case(self, case_id: str, artifacts: list[Artifact]) -> tuple[list[TimelineEvent], list[dict]]:
+        """Return a case's parsed timeline and changes, parsing on first use.
+        
+        Reruns and re-analyses of a case reuse the parse from its ingest or
+        first analysis.
+        """
+        with self._parse_cache_lock:
+            entry = self._parse_cache.get(case_id)
+            if entry is not None:
+                self._parse_cache.move_to_end(case_id)
+        
+        if entry is None:
+            entry = self._parse_artifacts(artifacts)
+            with self._parse_cache_lock:
+                self._parse_cache[case_id] = entry
+                while len(self._parse_cache) > self.settings.parse_cache_max_entries:
+                    self._parse_cache.popitem(last=False)
+        
+        timeline_events, changes_raw = entry
+        return list(timeline_events), list(changes_raw)
+    
+    async def aparse_case(self, case_id: str, artifacts: list[Artifact]) -> tuple[list[TimelineEvent], list[dict]]:
+        """Parse a case without blocking the event loop."""
+        return await asyncio.to_thread(self.parse_case, case_id, artifacts)
+    
+    def _parse_artifacts(self, artifacts: list[Artifact]) -> tuple[list[TimelineEvent], list[dict]]:
+        """Extract the earliest timeline events and detected changes from artifacts.
+        
+        Events are returned sorted by timestamp, capped at MAX_TIMELINE_EVENTS.
+        Several artifacts are parsed in parallel on the parser processes.
+        """
+        if self._parse_executor and len(artifacts) > 1:
+            per_artifact = list(self._parse_executor.map(_earliest_events, artifacts))
+        else:
+            per_artifact = [_earliest_events(artifact) for artifact in artifacts]
+        
+        # merge is stable, so ties keep artifact order
+        timeline_events = list(islice(
+            heapq.merge(*per_artifact, key=_event_time), MAX_TIMELINE_EVENTS
+        ))
+        
+        return timeline_events, extract_what_changed(artifacts)
+    
     def _build_search_query(self, summary: str, focus_area) -> str:
         """Build search query from summary and focus area."""
-        query = summary
-        
         if focus_area:
-            focus_terms = {
-                "database": "database connection pool query timeout deadlock",
-                "auth": "authentication authorization token jwt session login",
-                "network": "network connection timeout dns latency packet",
-                "deployment": "deploy release version rollback container image",
-                "performance": "latency response time memory cpu throughput"
-            }
-            query = f"{query} {focus_terms.get(focus_area.value, '')}"
-        
-        return query
+            return f"{summary} {FOCUS_TERMS.get(focus_area.value, '')}"
+        return summary
     
     def _summarize_timeline(self, events: list[TimelineEvent]) -> str:
         """Create a text summary of timeline events."""
         if not events:
             return "No timeline events extracted."
         
-        summary_parts = []
-        for event in events[:10]:  # Limit to first 10
-            summary_parts.append(f"- [{event.timestamp_str}] {event.kind}: {event.title}")
-        
-        return "\n".join(summary_parts)
+        # Limit to first 10
+        return _format_timeline(tuple(
+            (event.timestamp_str, event.kind, event.title) for event in events[:10]
+        ))
     
-    def _generate_hypotheses(
+    async def _generate_hypotheses(
         self,
         incident_summary: str,
-        evidence: list[Evidence],
-        changes_raw: list[dict],
-        timeline_summary: str,
+        context: dict,
         request: AnalyzeRequest
-    ) -> dict:
-        """Use LLM to generate hypotheses."""
+    ) -> tuple[dict, bool]:
+        """Use LLM to generate hypotheses.
         
-        # Build evidence context
-        evidence_context = []
-        for i, ev in enumerate(evidence):
-            evidence_context.append(f"[{i}] Source: {ev.source_id} ({ev.artifact_type.value})\n{ev.excerpt}")
+        Results are cached per prompt fingerprint, so re-analysing a case
+        with the same evidence skips the LLM. Returns the result and whether
+        it was served from the cache.
+        """
+        user_prompt = self._hypothesis_prompt(incident_summary, context, request)
         
-        changes_context = "\n".join([
-            f"- {c['category']}: {c['description']}" for c in changes_raw[:10]
-        ])
+        cache_key = self._hypothesis_cache_key(user_prompt)
+        cached = self._get_cached_hypotheses(cache_key)
+        if cached is not None:
+            return cached, True
         
-        user_prompt = f"""Analyze this incident and generate {request.hypothesis_count} ranked hypotheses.
-
-INCIDENT SUMMARY:
-{incident_summary}
-
-{f"USER NOTES: {request.user_notes}" if request.user_notes else ""}
-
-TIMELINE SUMMARY:
-{timeline_summary}
-
-CHANGES DETECTED:
-{changes_context if changes_context else "No explicit changes detected in artifacts."}
+        try:
+            response = await self.openai_client.chat.completions.create(
+                **self._completion_args(user_prompt)
+            )
+            
+            result = json.loads(response.choices[0].message.content or "{}")
+            self._store_cached_hypotheses(cache_key, result)
+            return result, False
+            
+        except Exception as e:
+            logger.error(f"LLM generation error: {e}")
+            return self._fallback_result(f"Analysis error: {str(e)}"), False
+    
+    def _completion_args(self, user_prompt: str) -> dict:
+        """Chat completion arguments for a single-case hypothesis prompt."""
+        return dict(
+            model=self.settings.chat_model,
+            messages=[
+                {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.3,
+            max_tokens=2000,
+            response_format={"type": "json_object"}
+        )
+    
+    async def _generate_hypotheses_batch(
+        self,
+        items: list[tuple[str, dict]],
+        request: AnalyzeBatchRequest
+    ) -> list[dict]:
+        """Generate hypotheses for several cases with one LLM call.
+        
+        Takes (incident_summary, context) items and returns one result per
+        item, in order. Results that came from the LLM are marked with
+        ``_from_llm`` so the caller can cache them; missing ones fall back
+        to a manual-review result.
+        """
+        cases_block = "\n".join(
+            f"=== CASE [{i}] ===\n" + self._case_context(incident_summary, context)
+            for i, (incident_summary, context) in enumerate(items)
+        )
+        user_prompt = f"""Analyze each of these {len(items)} incidents and generate {request.hypothesis_count} ranked hypotheses per incident.
 
-EVIDENCE (cite by index):
-{chr(10).join(evidence_context)}
+{cases_block}
 
-{f"FOCUS AREA: {request.focus_area.value}" if request.focus_area else ""}
+{self._analysis_constraints(request)}
 
-Generate hypotheses following the exact JSON schema. Each hypothesis must cite at least 2 evidence indices."""
+Evidence indices refer to the evidence list of the same case block. Return {{"results": [...]}} with one object per case, each following the exact JSON schema plus "case_index" set to the case number. Each hypothesis must cite at least 2 evidence indices."""
 
         try:
-            response = self.openai_client.chat.completions.create(
+            response = await self.openai_client.chat.completions.create(
                 model=self.settings.chat_model,
                 messages=[
                     {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.3,
-                max_tokens=2000,
+                max_tokens=min(2000 * len(items), 16000),
                 response_format={"type": "json_object"}
             )
             
-            result = json.loads(response.choices[0].message.content or "{}")
-            return result
-            
+            by_index = {}
+            for result in json.loads(response.choices[0].message.content or "{}").get("results", []):
+                by_index[result.pop("case_index", None)] = result
+            error = "Analysis error: no result returned for this case"
         except Exception as e:
-            logger.error(f"LLM generation error: {e}")
-            return {
-                "hypotheses": [],
-                "what_changed": [],
-                "recommended_next_steps": ["Review artifacts manually due to analysis error"],
-                "confidence_overall": 0.0,
-                "refusal_reason": f"Analysis error: {str(e)}"
-            }
+            logger.error(f"LLM batch generation error: {e}")
+            by_index = {}
+            error = f"Analysis error: {str(e)}"
+        
+        return [
+            {**by_index[i], "_from_llm": True} if i in by_index else self._fallback_result(error)
+            for i in range(len(items))
+        ]
+    
+    def _hypothesis_prompt(
+        self,
+        incident_summary: str,
+        context: dict,
+        request: AnalyzeRequest | AnalyzeBatchRequest
+    ) -> str:
+        """Build the user prompt for analyzing a single case."""
+        return f"""Analyze this incident and generate {request.hypothesis_count} ranked hypotheses.
+
+{self._case_context(incident_summary, context)}
+
+{self._analysis_constraints(request)}
+
+Generate hypotheses following the exact JSON schema. Each hypothesis must cite at least 2 evidence indices."""
+    
+    def _case_context(self, incident_summary: str, context: dict) -> str:
+        """Format the prompt sections describing one case and its evidence."""
+        
+        evidence_block = "\n".join(
+            f"[{i}] Source: {ev.source_id} ({ev.artifact_type.value})\n{excerpt}"
+            for i, (ev, excerpt) in enumerate(zip(context["prompt_evidence"], context["prompt_excerpts"]))
+        )
+        changes_block = "\n".join(
+            f"- {c['category']}: {c['description']}" for c in context["changes_raw"][:10]
+        )
+        
+        return f"""INCIDENT SUMMARY:
+{incident_summary}
+
+TIMELINE SUMMARY:
+{self._summarize_timeline(context["timeline_events"])}
+
+CHANGES DETECTED:
+{changes_block or "No explicit changes detected in artifacts."}
+
+EVIDENCE (cite by index):
+{evidence_block}"""
+    
+    def _analysis_constraints(self, request: AnalyzeRequest | AnalyzeBatchRequest) -> str:
+        """Format the analyst's notes and focus area for the prompt."""
+        user_notes = getattr(request, 'user_notes', None)
+        return "\n\n".join(filter(None, [
+            f"USER NOTES: {user_notes}" if user_notes else "",
+            f"FOCUS AREA: {request.focus_area.value}" if request.focus_area else ""
+        ]))
+    
+    def _fallback_result(self, reason: str) -> dict:
+        """Result used when the LLM call fails."""
+        return {
+            "hypotheses": [],
+            "what_changed": [],
+            "recommended_next_steps": ["Review artifacts manually due to analysis error"],
+            "confidence_overall": 0.0,
+            "refusal_reason": reason
+        }
+    
+    def _hypothesis_cache_key(self, user_prompt: str) -> str:
+        """Fingerprint the prompt that determines the LLM result."""
+        payload = f"{self.settings.chat_model}\n{ANALYSIS_SYSTEM_PROMPT}\n{user_prompt}"
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    
+    def _get_cached_hypotheses(self, key: str) -> Optional[dict]:
+        """Return a cached LLM result if present and not expired."""
+        entry = self._hypothesis_cache.get(key)
+        if entry is None:
+            self._hypothesis_cache_misses += 1
+            return None
+        
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.settings.llm_cache_ttl_seconds:
+            del self._hypothesis_cache[key]
+            self._hypothesis_cache_misses += 1
+            return None
+        
+        self._hypothesis_cache.move_to_end(key)
+        self._hypothesis_cache_hits += 1
+        return copy.deepcopy(result)
+    
+    def _store_cached_hypotheses(self, key: str, result: dict) -> None:
+        """Cache an LLM result, evicting the least recently used entries."""
+        self._hypothesis_cache[key] = (time.monotonic(), copy.deepcopy(result))
+        self._hypothesis_cache.move_to_end(key)
+        while len(self._hypothesis_cache) > self.settings.llm_cache_max_entries:
+            self._hypothesis_cache.popitem(last=False)
     
     def _build_hypotheses(self, raw_hypotheses: list[dict], evidence: list[Evidence]) -> list[Hypothesis]:
         """Build Hypothesis objects from LLM output."""
@@ -254,17 +689,8 @@ Generate hypotheses following the exact JSON schema. Each hypothesis must cite a
         
         for h in raw_hypotheses:
             # Map evidence indices to actual evidence
-            ev_indices = h.get("evidence_indices", [])
-            counter_indices = h.get("counter_evidence_indices", [])
-            
-            hypothesis_evidence = [
-                evidence[i] for i in ev_indices 
-                if i < len(evidence)
-            ]
-            counter_evidence = [
-                evidence[i] for i in counter_indices 
-                if i < len(evidence)
-            ]
+            hypothesis_evidence = self._select_evidence(h.get("evidence_indices", []), evidence)
+            counter_evidence = self._select_evidence(h.get("counter_evidence_indices", []), evidence)
             
             hypotheses.append(Hypothesis(
                 rank=h.get("rank", len(hypotheses) + 1),
@@ -287,11 +713,7 @@ Generate hypotheses following the exact JSON schema. Each hypothesis must cite a
         changes = []
         
         for c in raw_changes:
-            ev_indices = c.get("evidence_indices", [])
-            change_evidence = [
-                evidence[i] for i in ev_indices 
-                if i < len(evidence)
-            ]
+            change_evidence = self._select_evidence(c.get("evidence_indices", []), evidence)
             
             changes.append(WhatChanged(
                 category=c.get("category", "unknown"),
@@ -300,3 +722,14 @@ Generate hypotheses following the exact JSON schema. Each hypothesis must cite a
             ))
         
         return changes
+    
+    def _select_evidence(self, indices: list, evidence: list[Evidence]) -> list[Evidence]:
+        """Map cited indices to evidence, dropping repeats and invalid indices.
+        
+        Negative indices are rejected rather than wrapping around the list.
+        """
+        count = len(evidence)
+        return [
+            evidence[i] for i in dict.fromkeys(indices)
+            if isinstance(i, int) and 0 <= i < count
+        ]
@@ -1,12 +1,21 @@
 """Case storage and management."""
 
-import json
+import asyncio
+import os
+import sqlite3
+import threading
 import uuid
+from collections import OrderedDict
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 import logging
 
+import orjson
+import zstandard
+from pydantic import TypeAdapter
+
 from .config import get_settings
 from .models import (
     CaseStatus, CaseSummary, CaseDetail, Artifact, 
@@ -16,16 +25,157 @@ from .models import (
 logger = logging.getLogger(__name__)
 
 
+# Validate and dump whole lists in one pydantic-core call instead of per item
+_ARTIFACT_LIST = TypeAdapter(list[Artifact])
+_FEEDBACK_LIST = TypeAdapter(list[FeedbackRecord])
+
+
+# Fast level; case files are mostly repetitive log text and JSON keys
+CASE_ZSTD_LEVEL = 3
+
+
+def _read_case_file(path: Path) -> dict:
+    """Read and decode a compressed case file."""
+    # zstandard contexts are not thread-safe, so each call gets its own
+    return orjson.loads(zstandard.ZstdDecompressor().decompress(path.read_bytes()))
+
+
+def _encode_case(case_data: dict) -> bytes:
+    """Encode case data as a compressed case file."""
+    return zstandard.ZstdCompressor(level=CASE_ZSTD_LEVEL).compress(orjson.dumps(case_data))
+
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    case_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    artifact_count INTEGER NOT NULL,
+    last_analysis_at TEXT,
+    confidence REAL
+);
+CREATE INDEX IF NOT EXISTS idx_cases_created
+    ON cases (created_at DESC);
+"""
+
+
 class CaseStore:
-    """Manages case persistence using JSON files."""
+    """Manages case persistence using JSON files.
     
-    def __init__(self, cases_dir: Optional[str] = None):
+    Each case is a zstd-compressed ``{case_id}.json.zst`` document rewritten
+    atomically when its fields change. Feedback and analysis history are appended to
+    ``{case_id}.feedback.jsonl`` and ``{case_id}.history.jsonl`` so adding
+    a record never rewrites the case.
+    
+    Parsed case documents and listing summaries are cached in memory and
+    revalidated against the file's mtime and size, so edits made outside
+    this process are still picked up.
+    
+    When SQLite indexing is enabled, every case write is mirrored into the
+    ``cases.db`` manifest so listings are served by one indexed query
+    instead of parsing every case file. The case files remain the source
+    of truth.
+    """
+    
+    def __init__(self, cases_dir: Optional[str] = None, use_sqlite: Optional[bool] = None):
         settings = get_settings()
         self.cases_dir = Path(cases_dir or settings.cases_directory)
         self.cases_dir.mkdir(parents=True, exist_ok=True)
+        self._compress_legacy_cases()
+        
+        self.use_sqlite = settings.cases_use_sqlite if use_sqlite is None else use_sqlite
+        self.db_path = self.cases_dir / "cases.db"
+        if self.use_sqlite:
+            self._init_manifest()
+        
+        self._cache_max_entries = settings.case_cache_max_entries
+        self._cache_lock = threading.Lock()
+        # Serializes read-modify-write updates now that handlers run them in threads
+        self._write_lock = threading.Lock()
+        # case_id -> (file signature, case data), least recently used first
+        self._case_cache: OrderedDict[str, tuple[tuple[int, int], dict]] = OrderedDict()
+        # case file name -> (file signature, summary)
+        self._summary_cache: dict[str, tuple[tuple[int, int], CaseSummary]] = {}
+        
+        # Total number of cases, counted once and kept current on create
+        self._case_count = self._count_cases()
+        self._count_lock = threading.Lock()
     
     def _case_path(self, case_id: str) -> Path:
-        return self.cases_dir / f"{case_id}.json"
+        return self.cases_dir / f"{case_id}.json.zst"
+    
+    def _case_files(self):
+        return self.cases_dir.glob("*.json.zst")
+    
+    @staticmethod
+    def _case_id_from_path(path: Path) -> str:
+        return path.name[:-len(".json.zst")]
+    
+    def _compress_legacy_cases(self) -> None:
+        """Rewrite uncompressed case files from earlier versions."""
+        legacy = list(self.cases_dir.glob("*.json"))
+        for case_file in legacy:
+            try:
+                case_data = orjson.loads(case_file.read_bytes())
+            except orjson.JSONDecodeError as e:
+                logger.error(f"Error compressing case {case_file}: {e}")
+                continue
+            case_file.with_suffix(".json.zst").write_bytes(_encode_case(case_data))
+            case_file.unlink()
+        
+        if legacy:
+            logger.info(f"Compressed {len(legacy)} case files in {self.cases_dir}")
+    
+    def _feedback_path(self, case_id: str) -> Path:
+        return self.cases_dir / f"{case_id}.feedback.jsonl"
+    
+    def _history_path(self, case_id: str) -> Path:
+        return self.cases_dir / f"{case_id}.history.jsonl"
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, check_same_thread=False)
+    
+    def _init_manifest(self) -> None:
+        """Create the SQLite manifest and backfill cases missing from it."""
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(MANIFEST_SCHEMA)
+            indexed = {row[0] for row in conn.execute("SELECT case_id FROM cases")}
+        
+        missing = [p for p in self._case_files() if self._case_id_from_path(p) not in indexed]
+        for case_file in missing:
+            try:
+                self._index_case(_read_case_file(case_file))
+            except (zstandard.ZstdError, orjson.JSONDecodeError, KeyError) as e:
+                logger.error(f"Error indexing case {case_file}: {e}")
+        
+        if missing:
+            logger.info(f"Indexed {len(missing)} existing cases into {self.db_path}")
+    
+    def _count_cases(self) -> int:
+        """Count stored cases without loading them."""
+        if self.use_sqlite:
+            with closing(self._connect()) as conn:
+                return conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+        return sum(1 for _ in self._case_files())
+    
+    def _index_case(self, case_data: dict) -> None:
+        """Upsert the listing columns for a case."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cases "
+                "(case_id, title, status, created_at, artifact_count, last_analysis_at, confidence) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    case_data["case_id"],
+                    case_data["title"],
+                    case_data["status"],
+                    case_data["created_at"],
+                    len(case_data.get("artifacts", [])),
+                    case_data.get("last_analysis_at"),
+                    (case_data.get("last_analysis") or {}).get("confidence_overall")
+                )
+            )
     
     def create_case(self, request: IngestRequest) -> str:
         """Create a new case and return its ID."""
@@ -37,55 +187,87 @@ class CaseStore:
             "incident_summary": request.incident_summary,
             "status": CaseStatus.CREATED.value,
             "created_at": datetime.utcnow().isoformat(),
-            "artifacts": [a.model_dump(mode='json') for a in request.artifacts],
-            "last_analysis": None,
-            "analysis_history": []
+            "artifacts": _ARTIFACT_LIST.dump_python(request.artifacts, mode='json'),
+            "last_analysis": None
         }
         
-        with open(self._case_path(case_id), 'w') as f:
-            json.dump(case_data, f, indent=2, default=str)
+        self._save_case(case_id, case_data)
+        with self._count_lock:
+            self._case_count += 1
         
         logger.info(f"Created case {case_id}: {request.title}")
         return case_id
     
+    def count_cases(self) -> int:
+        """Number of cases in the store.
+        
+        Counted once at startup and incremented on create, so cases
+        written by other processes are not reflected until restart.
+        """
+        return self._case_count
+    
+    async def acreate_case(self, request: IngestRequest) -> str:
+        """Create a case without blocking the event loop."""
+        return await asyncio.to_thread(self.create_case, request)
+    
     def update_status(self, case_id: str, status: CaseStatus) -> None:
         """Update case status."""
-        case_data = self._load_case(case_id)
-        if case_data:
-            case_data["status"] = status.value
-            self._save_case(case_id, case_data)
+        with self._write_lock:
+            case_data = self._load_case(case_id)
+            if case_data:
+                case_data["status"] = status.value
+                self._save_case(case_id, case_data)
+    
+    async def aupdate_status(self, case_id: str, status: CaseStatus) -> None:
+        """Update case status without blocking the event loop."""
+        await asyncio.to_thread(self.update_status, case_id, status)
     
     def save_analysis(self, case_id: str, analysis: AnalyzeResponse) -> None:
         """Save analysis results to a case."""
-        case_data = self._load_case(case_id)
-        if case_data:
+        analysis_data = analysis.model_dump(mode='json')
+        analyzed_at = datetime.utcnow().isoformat()
+        with self._write_lock:
+            case_data = self._load_case(case_id)
+            if not case_data:
+                return
+            
             case_data["status"] = CaseStatus.ANALYZED.value
-            case_data["last_analysis"] = analysis.model_dump(mode='json')
-            case_data["last_analysis_at"] = datetime.utcnow().isoformat()
+            case_data["last_analysis"] = analysis_data
+            case_data["last_analysis_at"] = analyzed_at
             
             # Keep history
-            if "analysis_history" not in case_data:
-                case_data["analysis_history"] = []
-            case_data["analysis_history"].append({
-                "timestamp": datetime.utcnow().isoformat(),
+            self._migrate_embedded_log(case_data, "analysis_history", self._history_path(case_id))
+            self._append_record(self._history_path(case_id), {
+                "timestamp": analyzed_at,
                 "confidence": analysis.confidence_overall,
                 "hypothesis_count": len(analysis.hypotheses),
                 "refusal": analysis.refusal_reason is not None
             })
             
             self._save_case(case_id, case_data)
-            logger.info(f"Saved analysis for case {case_id}")
+        logger.info(f"Saved analysis for case {case_id}")
     
-    def get_case(self, case_id: str) -> Optional[CaseDetail]:
-        """Get full case details."""
+    async def asave_analysis(self, case_id: str, analysis: AnalyzeResponse) -> None:
+        """Save analysis results without blocking the event loop."""
+        await asyncio.to_thread(self.save_analysis, case_id, analysis)
+    
+    def get_case(self, case_id: str, include_analysis: bool = True) -> Optional[CaseDetail]:
+        """Get full case details.
+        
+        Rebuilding the last analysis validates every hypothesis and evidence
+        excerpt, so callers that do not need it can pass
+        ``include_analysis=False`` to leave it unset.
+        """
         case_data = self._load_case(case_id)
         if not case_data:
             return None
         
-        artifacts = [Artifact(**a) for a in case_data.get("artifacts", [])]
+        artifacts = _ARTIFACT_LIST.validate_python(case_data.get("artifacts", []))
         
         last_analysis = None
-        if case_data.get("last_analysis"):
+        if include_analysis and case_data.get("last_analysis"):
+            # Validated rather than model_construct-ed: construct does not
+            # rebuild nested models, so hypotheses and evidence would stay dicts
             last_analysis = AnalyzeResponse(**case_data["last_analysis"])
         
         return CaseDetail(
@@ -98,39 +280,91 @@ class CaseStore:
             last_analysis=last_analysis
         )
     
+    async def aget_case(self, case_id: str, include_analysis: bool = True) -> Optional[CaseDetail]:
+        """Get full case details without blocking the event loop."""
+        return await asyncio.to_thread(self.get_case, case_id, include_analysis)
+    
     def list_cases(self) -> list[CaseSummary]:
-        """List all cases."""
+        """List all cases, newest first."""
+        if self.use_sqlite:
+            return self._list_cases_indexed()
+        return self._scan_cases()
+    
+    async def alist_cases(self) -> list[CaseSummary]:
+        """List all cases without blocking the event loop."""
+        return await asyncio.to_thread(self.list_cases)
+    
+    def _list_cases_indexed(self) -> list[CaseSummary]:
+        """List cases from the SQLite manifest."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT case_id, title, status, created_at, artifact_count, "
+                "last_analysis_at, confidence FROM cases ORDER BY created_at DESC"
+            ).fetchall()
+        
+        # Rows were validated when written, so skip re-validating them here
+        return [
+            CaseSummary.model_construct(
+                case_id=case_id,
+                title=title,
+                status=CaseStatus(status),
+                created_at=datetime.fromisoformat(created_at),
+                artifact_count=artifact_count,
+                last_analysis=datetime.fromisoformat(last_analysis_at) if last_analysis_at else None,
+                confidence_overall=confidence
+            )
+            for case_id, title, status, created_at, artifact_count, last_analysis_at, confidence in rows
+        ]
+    
+    def _scan_cases(self) -> list[CaseSummary]:
+        """List cases by scanning the case files.
+        
+        Only case files changed since the previous scan are parsed.
+        """
         cases = []
+        summaries = {}
         
-        for case_file in self.cases_dir.glob("*.json"):
+        for case_file in self._case_files():
             try:
-                with open(case_file, 'r') as f:
-                    case_data = json.load(f)
-                
-                last_analysis_at = None
-                confidence = None
-                if case_data.get("last_analysis_at"):
-                    last_analysis_at = datetime.fromisoformat(case_data["last_analysis_at"])
-                if case_data.get("last_analysis"):
-                    confidence = case_data["last_analysis"].get("confidence_overall")
-                
-                cases.append(CaseSummary(
-                    case_id=case_data["case_id"],
-                    title=case_data["title"],
-                    status=CaseStatus(case_data["status"]),
-                    created_at=datetime.fromisoformat(case_data["created_at"]),
-                    artifact_count=len(case_data.get("artifacts", [])),
-                    last_analysis=last_analysis_at,
-                    confidence_overall=confidence
-                ))
-            except (json.JSONDecodeError, KeyError) as e:
+                signature = self._file_signature(case_file)
+                cached = self._summary_cache.get(case_file.name)
+                if cached and cached[0] == signature:
+                    summary = cached[1]
+                else:
+                    summary = self._build_summary(_read_case_file(case_file))
+            except (OSError, zstandard.ZstdError, orjson.JSONDecodeError, KeyError) as e:
                 logger.error(f"Error loading case {case_file}: {e}")
                 continue
+            
+            summaries[case_file.name] = (signature, summary)
+            cases.append(summary)
+        
+        # Drop summaries of deleted cases
+        self._summary_cache = summaries
         
         # Sort by created_at descending
         cases.sort(key=lambda x: x.created_at, reverse=True)
         return cases
     
+    def _build_summary(self, case_data: dict) -> CaseSummary:
+        """Build a listing summary from case data."""
+        last_analysis_at = None
+        confidence = None
+        if case_data.get("last_analysis_at"):
+            last_analysis_at = datetime.fromisoformat(case_data["last_analysis_at"])
+        if case_data.get("last_analysis"):
+            confidence = case_data["last_analysis"].get("confidence_overall")
+        
+        return CaseSummary(
+            case_id=case_data["case_id"],
+            title=case_data["title"],
+            status=CaseStatus(case_data["status"]),
+            created_at=datetime.fromisoformat(case_data["created_at"]),
+            artifact_count=len(case_data.get("artifacts", [])),
+            last_analysis=last_analysis_at,
+            confidence_overall=confidence
+        )
+    
     def case_exists(self, case_id: str) -> bool:
         """Check if a case exists."""
         return self._case_path(case_id).exists()
@@ -140,21 +374,82 @@ class CaseStore:
         case_data = self._load_case(case_id)
         if not case_data:
             return []
-        return [Artifact(**a) for a in case_data.get("artifacts", [])]
+        return _ARTIFACT_LIST.validate_python(case_data.get("artifacts", []))
     
     def _load_case(self, case_id: str) -> Optional[dict]:
-        """Load case data from file."""
+        """Load case data, reusing the cached copy if the file is unchanged.
+        
+        Returns a shallow copy: callers may set or remove top-level keys but
+        must not modify nested values in place.
+        """
         path = self._case_path(case_id)
-        if not path.exists():
+        try:
+            signature = self._file_signature(path)
+        except FileNotFoundError:
             return None
         
-        with open(path, 'r') as f:
-            return json.load(f)
+        with self._cache_lock:
+            cached = self._case_cache.get(case_id)
+            if cached and cached[0] == signature:
+                self._case_cache.move_to_end(case_id)
+                return dict(cached[1])
+        
+        case_data = _read_case_file(path)
+        
+        self._cache_case(case_id, signature, case_data)
+        return dict(case_data)
     
     def _save_case(self, case_id: str, case_data: dict) -> None:
-        """Save case data to file."""
-        with open(self._case_path(case_id), 'w') as f:
-            json.dump(case_data, f, indent=2, default=str)
+        """Save case data to file, replacing it atomically."""
+        path = self._case_path(case_id)
+        # Unique per thread so concurrent saves never share a temp file
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(_encode_case(case_data))
+        os.replace(tmp_path, path)
+        
+        if self.use_sqlite:
+            self._index_case(case_data)
+        self._cache_case(case_id, self._file_signature(path), dict(case_data))
+    
+    def _cache_case(self, case_id: str, signature: tuple[int, int], case_data: dict) -> None:
+        """Cache parsed case data, evicting the least recently used entries."""
+        with self._cache_lock:
+            self._case_cache[case_id] = (signature, case_data)
+            self._case_cache.move_to_end(case_id)
+            while len(self._case_cache) > self._cache_max_entries:
+                self._case_cache.popitem(last=False)
+    
+    @staticmethod
+    def _file_signature(path: Path) -> tuple[int, int]:
+        """Modification time and size, used to detect changed case files."""
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _append_record(self, path: Path, record: dict) -> None:
+        """Append one record to a JSONL log."""
+        with open(path, 'ab') as f:
+            f.write(orjson.dumps(record) + b"\n")
+    
+    def _read_records(self, path: Path) -> list[dict]:
+        """Read all records from a JSONL log."""
+        if not path.exists():
+            return []
+        
+        with open(path, 'rb') as f:
+            return [orjson.loads(line) for line in f if line.strip()]
+    
+    def _migrate_embedded_log(self, case_data: dict, key: str, path: Path) -> bool:
+        """Move records stored inside older case files to their JSONL log.
+        
+        Returns True if case_data changed and needs saving.
+        """
+        records = case_data.pop(key, None)
+        if records is None:
+            return False
+        
+        with open(path, 'ab') as f:
+            f.write(b"".join(orjson.dumps(record) + b"\n" for record in records))
+        return True
     
     # ============== FEEDBACK METHODS ==============
     
@@ -181,26 +476,32 @@ class CaseStore:
             timestamp=datetime.utcnow()
         )
         
-        # Initialize feedback list if needed
-        if "feedback" not in case_data:
-            case_data["feedback"] = []
-        
-        case_data["feedback"].append(feedback_record.model_dump(mode='json'))
-        self._save_case(case_id, case_data)
+        with self._write_lock:
+            if self._migrate_embedded_log(case_data, "feedback", self._feedback_path(case_id)):
+                self._save_case(case_id, case_data)
+            
+            self._append_record(self._feedback_path(case_id), feedback_record.model_dump(mode='json'))
         
         logger.info(f"Added feedback for case {case_id}: hypothesis #{request.hypothesis_rank} - {request.feedback_type.value}")
         return feedback_record
     
+    async def aadd_feedback(self, case_id: str, request: FeedbackRequest) -> Optional[FeedbackRecord]:
+        """Add feedback without blocking the event loop."""
+        return await asyncio.to_thread(self.add_feedback, case_id, request)
+    
     def get_feedback(self, case_id: str) -> list[FeedbackRecord]:
         """Get all feedback for a case."""
         case_data = self._load_case(case_id)
         if not case_data:
             return []
         
-        return [
-            FeedbackRecord(**f) 
-            for f in case_data.get("feedback", [])
-        ]
+        # Cases written before feedback moved to its own log keep it inline
+        records = case_data.get("feedback", []) + self._read_records(self._feedback_path(case_id))
+        return _FEEDBACK_LIST.validate_python(records)
+    
+    async def aget_feedback(self, case_id: str) -> list[FeedbackRecord]:
+        """Get all feedback for a case without blocking the event loop."""
+        return await asyncio.to_thread(self.get_feedback, case_id)
     
     def get_hypothesis_feedback(self, case_id: str, hypothesis_rank: int) -> Optional[FeedbackRecord]:
         """Get the latest feedback for a specific hypothesis."""
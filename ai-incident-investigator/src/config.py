@@ -15,25 +15,58 @@ class Settings(BaseSettings):
     embedding_model: str = "text-embedding-3-small"
     chat_model: str = "gpt-4o-mini"
     
+    # Embedding cache
+    embedding_cache_ttl_seconds: int = 3600
+    embedding_cache_max_entries: int = 1024
+    # float32, or float16 to halve cache memory at a small precision cost
+    embedding_cache_dtype: str = "float32"
+    # Persist embeddings next to the Chroma index so repeated text is reused
+    embedding_store_enabled: bool = True
+    # Embedding batches requested in parallel while indexing
+    embedding_max_concurrency: int = 4
+    
     # Analysis Configuration
     default_top_k: int = 8
     default_hypothesis_count: int = 3
     confidence_threshold: float = 0.6
+    parse_workers: int = 4
+    parse_cache_max_entries: int = 256
+    evidence_excerpt_max_tokens: int = 400
+    evidence_prompt_max_tokens: int = 6000
+    
+    # LLM Configuration
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_max_entries: int = 256
+    llm_batch_max_cases: int = 5
     
     # Storage paths
     cases_directory: str = "./cases"
     chroma_persist_directory: str = "./chroma_db"
+    hnsw_search_ef: int = 64
+    # Graph shape for new case collections; existing collections keep theirs
+    hnsw_m: int = 16
+    hnsw_construction_ef: int = 200
+    case_cache_max_entries: int = 256
+    cases_use_sqlite: bool = True
     
     # Server Configuration
     host: str = "0.0.0.0"
     port: int = 8003
+    # Event loop for uvicorn; "uvloop" (shipped with uvicorn[standard]) is
+    # recommended in production, "asyncio" is the stdlib fallback.
+    event_loop: str = "uvloop"
     
     class Config:
         env_file = ".env"
         extra = "ignore"
+        frozen = True
 
 
-@lru_cache()
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get cached settings instance."""
+    """Get the process-wide settings instance.
+    
+    Settings are read from the environment once; changing them requires a
+    restart.
+    """
     return Settings()
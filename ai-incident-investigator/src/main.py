@@ -9,15 +9,19 @@ This service provides incident investigation capabilities:
 - Human feedback loop
 """
 
+import asyncio
+import json
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
 
 from .config import get_settings
 from .models import (
     IngestRequest, IngestResponse, AnalyzeRequest, AnalyzeResponse,
+    AnalyzeBatchRequest, AnalyzeBatchResponse,
     RerunRequest, CasesListResponse, CaseDetail, CaseStatus,
     FeedbackRequest, FeedbackResponse, FeedbackRecord
 )
@@ -55,13 +59,16 @@ async def lifespan(app: FastAPI):
     yield
     
     logger.info("Shutting down AI Incident Investigator...")
+    await analyzer.shutdown()
+    vector_store.close()
 
 
 app = FastAPI(
     title="AI Incident Investigator",
     description="Interactive incident investigation system with root cause analysis",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -78,7 +85,7 @@ app.add_middleware(
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle unexpected errors gracefully without leaking internals."""
     logger.error(f"Unhandled error on {request.url.path}: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "internal_server_error",
@@ -87,14 +94,36 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+def _analysis_response(result: BaseModel) -> Response:
+    """
+    Serialize an analysis result straight to JSON.
+    
+    The analyzer builds every nested model itself, so the usual
+    response_model dump/re-validate round trip is skipped.
+    """
+    return Response(content=result.model_dump_json(), media_type="application/json")
+
+
+async def _run_analysis(case: CaseDetail, request: AnalyzeRequest) -> AnalyzeResponse:
+    """Analyze a loaded case and save the result."""
+    result = await analyzer.analyze(
+        case_id=case.case_id,
+        incident_summary=case.incident_summary,
+        artifacts=case.artifacts,
+        request=request
+    )
+    await case_store.asave_analysis(case.case_id, result)
+    return result
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    cases = case_store.list_cases() if case_store else []
     return {
         "status": "healthy",
         "service": "ai-incident-investigator",
-        "total_cases": len(cases)
+        "total_cases": case_store.count_cases() if case_store else 0,
+        "caches": analyzer.get_cache_stats() if analyzer else {}
     }
 
 
@@ -105,18 +134,22 @@ async def ingest_case(request: IngestRequest):
     
     Creates a case, stores metadata, and indexes artifacts for retrieval.
     """
-    if not case_store or not vector_store:
+    if not case_store or not vector_store or not analyzer:
         raise HTTPException(status_code=503, detail="Service not initialized")
     
     try:
         # Create case
-        case_id = case_store.create_case(request)
+        case_id = await case_store.acreate_case(request)
         
-        # Index artifacts
-        chunks_indexed = vector_store.index_artifacts(case_id, request.artifacts)
+        # Index artifacts; the timeline is parsed meanwhile so the first
+        # analysis does not have to
+        chunks_indexed, _ = await asyncio.gather(
+            vector_store.aindex_artifacts(case_id, request.artifacts),
+            analyzer.aparse_case(case_id, request.artifacts)
+        )
         
         # Update status
-        case_store.update_status(case_id, CaseStatus.INGESTED)
+        await case_store.aupdate_status(case_id, CaseStatus.INGESTED)
         
         logger.info(f"Ingested case {case_id}: {request.title} ({chunks_indexed} chunks)")
         
@@ -144,7 +177,7 @@ async def analyze_case(request: AnalyzeRequest):
         raise HTTPException(status_code=503, detail="Service not initialized")
     
     # Get case
-    case = case_store.get_case(request.case_id)
+    case = await case_store.aget_case(request.case_id, include_analysis=False)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -155,16 +188,7 @@ async def analyze_case(request: AnalyzeRequest):
         )
     
     try:
-        # Run analysis
-        result = analyzer.analyze(
-            case_id=request.case_id,
-            incident_summary=case.incident_summary,
-            artifacts=case.artifacts,
-            request=request
-        )
-        
-        # Save results
-        case_store.save_analysis(request.case_id, result)
+        result = await _run_analysis(case, request)
         
         logger.info(
             f"Analyzed case {request.case_id}: "
@@ -172,20 +196,113 @@ async def analyze_case(request: AnalyzeRequest):
             f"confidence {result.confidence_overall:.2f}"
         )
         
-        return result
+        return _analysis_response(result)
         
     except Exception as e:
         logger.error(f"Analysis error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/analyze/stream")
+async def analyze_case_stream(request: AnalyzeRequest):
+    """
+    Analyze an incident case, streaming progress as server-sent events.
+    
+    Emits a ``timeline`` event once artifacts are parsed, ``delta`` events
+    carrying the LLM output as it is generated, and a final ``result`` event
+    with the same body /analyze returns. Failures end the stream with an
+    ``error`` event.
+    """
+    if not case_store or not analyzer:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+    
+    case = await case_store.aget_case(request.case_id, include_analysis=False)
+    if not case:
+        raise HTTPException(status_code=404, detail="Case not found")
+    
+    if case.status == CaseStatus.CREATED:
+        raise HTTPException(
+            status_code=400, 
+            detail="Case not yet ingested. Run /ingest first."
+        )
+    
+    async def events():
+        try:
+            async for kind, payload in analyzer.analyze_stream(
+                case_id=request.case_id,
+                incident_summary=case.incident_summary,
+                artifacts=case.artifacts,
+                request=request
+            ):
+                if kind == "timeline":
+                    data = json.dumps([event.model_dump(mode="json") for event in payload])
+                elif kind == "result":
+                    await case_store.asave_analysis(request.case_id, payload)
+                    logger.info(
+                        f"Analyzed case {request.case_id} (streamed): "
+                        f"{len(payload.hypotheses)} hypotheses, "
+                        f"confidence {payload.confidence_overall:.2f}"
+                    )
+                    data = payload.model_dump_json()
+                else:
+                    data = json.dumps(payload)
+                yield f"event: {kind}\ndata: {data}\n\n"
+        
+        except Exception as e:
+            logger.error(f"Streaming analysis error: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/analyze/batch", response_model=AnalyzeBatchResponse)
+async def analyze_cases_batch(request: AnalyzeBatchRequest):
+    """
+    Analyze several incident cases.
+    
+    Cases are analyzed together in as few LLM calls as possible.
+    Strict mode applies to each case individually.
+    """
+    if not case_store or not analyzer:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+    
+    cases = await asyncio.gather(*(
+        case_store.aget_case(case_id, include_analysis=False) for case_id in request.case_ids
+    ))
+    missing = [case_id for case_id, case in zip(request.case_ids, cases) if not case]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Cases not found: {', '.join(missing)}")
+    
+    not_ingested = [case.case_id for case in cases if case.status == CaseStatus.CREATED]
+    if not_ingested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cases not yet ingested: {', '.join(not_ingested)}. Run /ingest first."
+        )
+    
+    try:
+        results = await analyzer.analyze_batch(list(cases), request)
+        
+        await asyncio.gather(*(
+            case_store.asave_analysis(result.case_id, result) for result in results
+        ))
+        
+        logger.info(f"Analyzed {len(results)} cases in batch")
+        
+        return _analysis_response(AnalyzeBatchResponse(results=results, total_cases=len(results)))
+        
+    except Exception as e:
+        logger.error(f"Batch analysis error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/cases", response_model=CasesListResponse)
 async def list_cases():
     """List all incident cases."""
     if not case_store:
         raise HTTPException(status_code=503, detail="Service not initialized")
     
-    cases = case_store.list_cases()
+    cases = await case_store.alist_cases()
     return CasesListResponse(cases=cases, total_cases=len(cases))
 
 
@@ -195,7 +312,7 @@ async def get_case(case_id: str):
     if not case_store:
         raise HTTPException(status_code=503, detail="Service not initialized")
     
-    case = case_store.get_case(case_id)
+    case = await case_store.aget_case(case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -212,7 +329,7 @@ async def rerun_analysis(case_id: str, request: RerunRequest):
     if not case_store or not analyzer:
         raise HTTPException(status_code=503, detail="Service not initialized")
     
-    case = case_store.get_case(case_id)
+    case = await case_store.aget_case(case_id, include_analysis=False)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -223,26 +340,16 @@ async def rerun_analysis(case_id: str, request: RerunRequest):
         top_k=request.top_k,
         hypothesis_count=request.hypothesis_count,
         focus_area=request.focus_area,
-        user_notes=request.user_notes
+        user_notes=request.user_notes,
+        exclude_sources=request.exclude_sources
     )
     
-    # Add rerun-specific fields
-    if request.exclude_sources:
-        setattr(analyze_request, 'exclude_sources', request.exclude_sources)
-    
     try:
-        result = analyzer.analyze(
-            case_id=case_id,
-            incident_summary=case.incident_summary,
-            artifacts=case.artifacts,
-            request=analyze_request
-        )
-        
-        case_store.save_analysis(case_id, result)
+        result = await _run_analysis(case, analyze_request)
         
         logger.info(f"Reran analysis for case {case_id}")
         
-        return result
+        return _analysis_response(result)
         
     except Exception as e:
         logger.error(f"Rerun error: {e}")
@@ -262,7 +369,7 @@ async def submit_feedback(case_id: str, request: FeedbackRequest):
     if not case_store:
         raise HTTPException(status_code=503, detail="Service not initialized")
     
-    case = case_store.get_case(case_id)
+    case = await case_store.aget_case(case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -277,7 +384,7 @@ async def submit_feedback(case_id: str, request: FeedbackRequest):
     
     try:
         import uuid
-        feedback_record = case_store.add_feedback(case_id, request)
+        feedback_record = await case_store.aadd_feedback(case_id, request)
         
         if not feedback_record:
             raise HTTPException(status_code=500, detail="Failed to save feedback")
@@ -306,10 +413,10 @@ async def get_feedback(case_id: str):
     if not case_store.case_exists(case_id):
         raise HTTPException(status_code=404, detail="Case not found")
     
-    return case_store.get_feedback(case_id)
+    return await case_store.aget_feedback(case_id)
 
 
 if __name__ == "__main__":
     import uvicorn
     settings = get_settings()
-    uvicorn.run(app, host=settings.host, port=settings.port)
+    uvicorn.run(app, host=settings.host, port=settings.port, loop=settings.event_loop, http="httptools")
@@ -1,6 +1,6 @@
 """Pydantic models for AI Incident Investigator."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -48,8 +48,8 @@ class IngestRequest(BaseModel):
     incident_summary: str = Field(..., min_length=10, max_length=5000)
     artifacts: list[Artifact] = Field(..., min_length=1)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "title": "Database Connection Pool Exhaustion",
                 "incident_summary": "Users reported slow response times...",
@@ -58,6 +58,7 @@ class IngestRequest(BaseModel):
                 ]
             }
         }
+    )
 
 
 class IngestResponse(BaseModel):
@@ -118,9 +119,10 @@ class AnalyzeRequest(BaseModel):
     # Time scoping for analysis
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    exclude_sources: list[str] = Field(default_factory=list)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "case_id": "abc-123",
                 "strict_mode": True,
@@ -131,6 +133,7 @@ class AnalyzeRequest(BaseModel):
                 "end_time": "2024-01-15T15:00:00Z"
             }
         }
+    )
 
 
 class AnalyzeResponse(BaseModel):
@@ -145,6 +148,30 @@ class AnalyzeResponse(BaseModel):
     analysis_metadata: dict = Field(default_factory=dict)
 
 
+class AnalyzeBatchRequest(BaseModel):
+    """Request to analyze several cases together."""
+    case_ids: list[str] = Field(..., min_length=1, max_length=50)
+    strict_mode: bool = True
+    top_k: int = Field(default=8, ge=1, le=20)
+    hypothesis_count: int = Field(default=3, ge=1, le=5)
+    focus_area: Optional[FocusArea] = None
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "case_ids": ["abc-123", "def-456"],
+                "strict_mode": True
+            }
+        }
+    )
+
+
+class AnalyzeBatchResponse(BaseModel):
+    """Response from analyzing several cases."""
+    results: list[AnalyzeResponse]
+    total_cases: int
+
+
 class RerunRequest(BaseModel):
     """Request to rerun analysis with constraints."""
     strict_mode: bool = True
@@ -206,14 +233,15 @@ class FeedbackRequest(BaseModel):
     feedback_type: FeedbackType
     reviewer_note: Optional[str] = Field(default=None, max_length=1000)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "hypothesis_rank": 1,
                 "feedback_type": "confirmed",
                 "reviewer_note": "Verified via pg_stat_activity"
             }
         }
+    )
 
 
 class FeedbackRecord(BaseModel):
@@ -1,7 +1,12 @@
-"""Parsers for extracting events and patterns from incident artifacts."""
+"""Parsers for extracting events and patterns from incident artifacts.
+
+Events are built with the validating constructors on purpose: for these
+small models pydantic-core's validator is cheaper than ``model_construct``,
+which fills in fields from Python.
+"""
 
 import re
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 from .models import TimelineEvent, Evidence, ArtifactType, Artifact
 
@@ -9,38 +14,119 @@ from .models import TimelineEvent, Evidence, ArtifactType, Artifact
 # Common timestamp patterns
 TIMESTAMP_PATTERNS = [
     # ISO 8601
-    (r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)', '%Y-%m-%dT%H:%M:%S'),
+    (re.compile(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)'), '%Y-%m-%dT%H:%M:%S'),
     # Common log format
-    (r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?)', '%Y-%m-%d %H:%M:%S'),
+    (re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?)'), '%Y-%m-%d %H:%M:%S'),
     # Syslog style
-    (r'([A-Z][a-z]{2}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})', '%b %d %H:%M:%S'),
+    (re.compile(r'([A-Z][a-z]{2}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})'), '%b %d %H:%M:%S'),
     # Unix timestamp (seconds)
-    (r'\b(\d{10})\b', 'unix'),
+    (re.compile(r'\b(\d{10})\b'), 'unix'),
     # Unix timestamp (milliseconds)
-    (r'\b(\d{13})\b', 'unix_ms'),
+    (re.compile(r'\b(\d{13})\b'), 'unix_ms'),
 ]
 
+
+def _compile_patterns(patterns: list[tuple[str, str]]) -> list[tuple[re.Pattern, str]]:
+    """Compile case-insensitive (pattern, kind) pairs."""
+    return [(re.compile(pattern, re.IGNORECASE), kind) for pattern, kind in patterns]
+
+
+def _compile_union(patterns: list[tuple[re.Pattern, str]]) -> re.Pattern:
+    """Combine (pattern, kind) pairs into one regex, one named group per kind.
+    
+    Every pattern starts with a word boundary, which is hoisted out of the
+    alternation so the engine only tries the alternatives at word starts.
+    The union is case-sensitive and runs on lowercased text, which the
+    regex engine scans far faster than with IGNORECASE; every literal in
+    the patterns is already lowercase.
+    """
+    grouped: dict[str, list[str]] = {}
+    for pattern, kind in patterns:
+        grouped.setdefault(kind, []).append(pattern.pattern.removeprefix(r'\b'))
+    alternatives = "|".join(
+        f"(?P<{kind}>{'|'.join(sources)})" for kind, sources in grouped.items()
+    )
+    return re.compile(rf"\b(?:{alternatives})")
+
+
+def _first_kind(line: str, union: re.Pattern, patterns: list[tuple[re.Pattern, str]]) -> Optional[str]:
+    """Return the first listed kind whose pattern occurs in the line.
+    
+    One scan with the union rejects the common non-matching line. On a
+    hit the union reports the leftmost kind, so only kinds listed before
+    it need checking to keep list order as the priority.
+    """
+    match = union.search(line.lower())
+    if not match:
+        return None
+    kind = match.lastgroup
+    for pattern, earlier in patterns:
+        if earlier == kind:
+            break
+        if pattern.search(line):
+            return earlier
+    return kind
+
+
+def _matching_lines(content: str, *unions: re.Pattern) -> list[str]:
+    """Return the lines of content in which any of the unions match, in order.
+    
+    Each union is searched over the whole content, skipping to the next
+    line after a hit, so lines that match nothing are never split out.
+    """
+    lowered = content.lower()
+    if len(lowered) != len(content):
+        # A few characters lowercase to several, so offsets would drift
+        return [
+            line for line in content.split('\n')
+            if any(union.search(line.lower()) for union in unions)
+        ]
+    
+    starts = set()
+    for union in unions:
+        pos = 0
+        while match := union.search(lowered, pos):
+            starts.add(content.rfind('\n', 0, match.start()) + 1)
+            pos = content.find('\n', match.start()) + 1
+            if not pos:
+                break
+    
+    lines = []
+    for start in sorted(starts):
+        end = content.find('\n', start)
+        lines.append(content[start:end] if end != -1 else content[start:])
+    return lines
+
+
 # Error patterns to detect
-ERROR_PATTERNS = [
-    (r'(?i)\b(exception|error|fatal|critical|failure|failed)\b[:\s]*(.{0,100})', 'error'),
-    (r'(?i)\b(timeout|timed?\s*out)\b[:\s]*(.{0,100})', 'timeout'),
-    (r'(?i)\b(5\d{2})\s+(error|internal server error)', 'http_5xx'),
-    (r'(?i)\b(connection\s+(?:refused|reset|timeout|failed))\b', 'connection_error'),
-    (r'(?i)\b(oom|out\s*of\s*memory|memory\s+exhausted)\b', 'memory'),
-    (r'(?i)\b(deadlock|lock\s+timeout|waiting\s+for\s+lock)\b', 'database'),
-    (r'(?i)\b(pool\s+exhausted|no\s+available\s+connections?)\b', 'pool_exhaustion'),
-    (r'(?i)\b(jwt|token)\s+(?:invalid|expired|validation\s+failed)\b', 'auth'),
-    (r'(?i)\b(iat|exp|nbf)\s+(?:claim|validation)\b', 'auth'),
-    (r'(?i)\b(clock\s+skew|time\s+sync|ntp)\b', 'clock'),
-]
+ERROR_PATTERNS = _compile_patterns([
+    (r'\b(exception|error|fatal|critical|failure|failed)\b[:\s]*(.{0,100})', 'error'),
+    (r'\b(timeout|timed?\s*out)\b[:\s]*(.{0,100})', 'timeout'),
+    (r'\b(5\d{2})\s+(error|internal server error)', 'http_5xx'),
+    (r'\b(connection\s+(?:refused|reset|timeout|failed))\b', 'connection_error'),
+    (r'\b(oom|out\s*of\s*memory|memory\s+exhausted)\b', 'memory'),
+    (r'\b(deadlock|lock\s+timeout|waiting\s+for\s+lock)\b', 'database'),
+    (r'\b(pool\s+exhausted|no\s+available\s+connections?)\b', 'pool_exhaustion'),
+    (r'\b(jwt|token)\s+(?:invalid|expired|validation\s+failed)\b', 'auth'),
+    (r'\b(iat|exp|nbf)\s+(?:claim|validation)\b', 'auth'),
+    (r'\b(clock\s+skew|time\s+sync|ntp)\b', 'clock'),
+])
+ERROR_RE = _compile_union(ERROR_PATTERNS)
 
 # Deploy patterns
-DEPLOY_PATTERNS = [
-    (r'(?i)\b(deployed|deploying|deployment)\b[:\s]*(.{0,100})', 'deploy'),
-    (r'(?i)\b(rollback|rolled\s+back|reverting)\b[:\s]*(.{0,100})', 'rollback'),
-    (r'(?i)\b(version|release|build)[:\s]+([v\d]+[\w.-]*)', 'version'),
-    (r'(?i)\b(image|container)[:\s]+([^\s]+:[^\s]+)', 'container'),
-]
+DEPLOY_PATTERNS = _compile_patterns([
+    (r'\b(deployed|deploying|deployment)\b[:\s]*(.{0,100})', 'deploy'),
+    (r'\b(rollback|rolled\s+back|reverting)\b[:\s]*(.{0,100})', 'rollback'),
+    (r'\b(version|release|build)[:\s]+([v\d]+[\w.-]*)', 'version'),
+    (r'\b(image|container)[:\s]+([^\s]+:[^\s]+)', 'container'),
+])
+DEPLOY_RE = _compile_union(DEPLOY_PATTERNS)
+
+# Config change lines
+CONFIG_PATTERN = re.compile(r'(config|setting|parameter)[:\s]+(\w+)[:\s=]+([^\n]+)', re.IGNORECASE)
+
+# Keywords marking an alert line, matched against lowercased text
+ALERT_HINT_RE = re.compile(r'severity|alert|triggered|threshold')
 
 # Alert patterns (for JSON alerts)
 ALERT_PATTERNS = [
@@ -48,100 +134,128 @@ ALERT_PATTERNS = [
 ]
 
 
-def extract_timestamp(text: str) -> Optional[datetime]:
-    """Extract the first timestamp from text."""
+def extract_timestamp_both(text: str) -> tuple[Optional[datetime], str]:
+    """Extract the first timestamp from text, parsed and as written.
+    
+    The string is the first pattern match even when it cannot be parsed,
+    in which case later patterns are still tried for the datetime.
+    """
+    ts_str = None
     for pattern, fmt in TIMESTAMP_PATTERNS:
-        match = re.search(pattern, text)
+        match = pattern.search(text)
         if match:
-            ts_str = match.group(1)
+            raw = match.group(1)
+            if ts_str is None:
+                ts_str = raw
             try:
                 if fmt == 'unix':
-                    return datetime.fromtimestamp(int(ts_str))
+                    return datetime.fromtimestamp(int(raw)), ts_str
                 elif fmt == 'unix_ms':
-                    return datetime.fromtimestamp(int(ts_str) / 1000)
+                    return datetime.fromtimestamp(int(raw) / 1000), ts_str
+                elif fmt == '%b %d %H:%M:%S':
+                    return datetime.strptime(raw, fmt), ts_str
                 else:
-                    # Handle ISO format with timezone
-                    ts_str = re.sub(r'[+-]\d{2}:?\d{2}$', '', ts_str)
-                    ts_str = ts_str.rstrip('Z')
-                    ts_str = ts_str.split('.')[0]  # Remove microseconds
-                    return datetime.strptime(ts_str, fmt)
+                    # ISO and common log formats share the first 19 characters;
+                    # the fraction and UTC offset that may follow are dropped
+                    return datetime.fromisoformat(raw[:19]), ts_str
             except (ValueError, OSError):
                 continue
+    return None, ts_str or "unknown"
+
+
+def extract_unix_time(text: str) -> Optional[int]:
+    """Extract the first timestamp from text as seconds since the epoch.
+    
+    Unlike extract_timestamp, UTC offsets are applied and epoch values are
+    kept as written, so the result does not depend on the host's timezone.
+    Timestamps without an offset are read as UTC. Yearless syslog stamps
+    cannot be placed and give None.
+    """
+    for pattern, fmt in TIMESTAMP_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        raw = match.group(1)
+        if fmt == 'unix':
+            return int(raw)
+        if fmt == 'unix_ms':
+            return int(raw) // 1000
+        if fmt == '%b %d %H:%M:%S':
+            return None
+        try:
+            ts = datetime.fromisoformat(raw)
+        except ValueError:
+            continue
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return int(ts.timestamp())
     return None
 
 
+def extract_timestamp(text: str) -> Optional[datetime]:
+    """Extract the first timestamp from text."""
+    return extract_timestamp_both(text)[0]
+
+
 def extract_timestamp_str(text: str) -> str:
     """Extract timestamp as string."""
-    for pattern, _ in TIMESTAMP_PATTERNS:
-        match = re.search(pattern, text)
-        if match:
-            return match.group(1)
-    return "unknown"
+    return extract_timestamp_both(text)[1]
 
 
 def parse_log_lines(content: str, source_id: str) -> list[TimelineEvent]:
     """Parse log content and extract events."""
     events = []
-    lines = content.split('\n')
     
-    for line in lines:
+    for line in _matching_lines(content, ERROR_RE, DEPLOY_RE):
         line = line.strip()
-        if not line:
-            continue
         
         # Check for error patterns
-        for pattern, kind in ERROR_PATTERNS:
-            match = re.search(pattern, line)
-            if match:
-                ts = extract_timestamp(line)
-                ts_str = extract_timestamp_str(line)
-                
-                # Determine severity
-                if kind in ['error', 'memory', 'pool_exhaustion']:
-                    severity = 'error'
-                elif kind in ['timeout', 'connection_error', 'database']:
-                    severity = 'warning'
-                else:
-                    severity = 'info'
-                
-                events.append(TimelineEvent(
-                    timestamp=ts,
-                    timestamp_str=ts_str,
-                    kind=kind,
-                    title=f"{kind.replace('_', ' ').title()} detected",
-                    details=line[:500],
-                    severity=severity,
-                    evidence=[Evidence(
-                        source_id=source_id,
-                        excerpt=line[:300],
-                        relevance=0.8,
-                        artifact_type=ArtifactType.LOGS
-                    )]
-                ))
-                break  # Only match first pattern per line
+        kind = _first_kind(line, ERROR_RE, ERROR_PATTERNS)
+        if kind:
+            ts, ts_str = extract_timestamp_both(line)
+            
+            # Determine severity
+            if kind in ['error', 'memory', 'pool_exhaustion']:
+                severity = 'error'
+            elif kind in ['timeout', 'connection_error', 'database']:
+                severity = 'warning'
+            else:
+                severity = 'info'
+            
+            events.append(TimelineEvent(
+                timestamp=ts,
+                timestamp_str=ts_str,
+                kind=kind,
+                title=f"{kind.replace('_', ' ').title()} detected",
+                details=line[:500],
+                severity=severity,
+                evidence=[Evidence(
+                    source_id=source_id,
+                    excerpt=line[:300],
+                    relevance=0.8,
+                    artifact_type=ArtifactType.LOGS
+                )]
+            ))
         
         # Check for deploy patterns
-        for pattern, kind in DEPLOY_PATTERNS:
-            match = re.search(pattern, line)
-            if match:
-                ts = extract_timestamp(line)
-                ts_str = extract_timestamp_str(line)
-                
-                events.append(TimelineEvent(
-                    timestamp=ts,
-                    timestamp_str=ts_str,
-                    kind=kind,
-                    title=f"{kind.replace('_', ' ').title()} event",
-                    details=line[:500],
-                    severity='info',
-                    evidence=[Evidence(
-                        source_id=source_id,
-                        excerpt=line[:300],
-                        relevance=0.9,
-                        artifact_type=ArtifactType.LOGS
-                    )]
-                ))
-                break
+        kind = _first_kind(line, DEPLOY_RE, DEPLOY_PATTERNS)
+        if kind:
+            ts, ts_str = extract_timestamp_both(line)
+            
+            events.append(TimelineEvent(
+                timestamp=ts,
+                timestamp_str=ts_str,
+                kind=kind,
+                title=f"{kind.replace('_', ' ').title()} event",
+                details=line[:500],
+                severity='info',
+                evidence=[Evidence(
+                    source_id=source_id,
+                    excerpt=line[:300],
+                    relevance=0.9,
+                    artifact_type=ArtifactType.LOGS
+                )]
+            ))
     
     return events
 
@@ -151,13 +265,11 @@ def parse_deploy_history(content: str, source_id: str) -> list[TimelineEvent]:
     events = []
     
     # Try to find deploy-related lines
-    lines = content.split('\n')
-    for line in lines:
+    for line in _matching_lines(content, DEPLOY_RE):
         for pattern, kind in DEPLOY_PATTERNS:
-            match = re.search(pattern, line)
+            match = pattern.search(line)
             if match:
-                ts = extract_timestamp(line)
-                ts_str = extract_timestamp_str(line)
+                ts, ts_str = extract_timestamp_both(line)
                 
                 events.append(TimelineEvent(
                     timestamp=ts,
@@ -182,33 +294,31 @@ def parse_alerts(content: str, source_id: str) -> list[TimelineEvent]:
     events = []
     
     # Simple heuristic: look for alert-like patterns
-    lines = content.split('\n')
-    for line in lines:
-        if any(p in line.lower() for p in ['severity', 'alert', 'triggered', 'threshold']):
-            ts = extract_timestamp(line)
-            ts_str = extract_timestamp_str(line)
-            
-            # Determine severity from content
-            severity = 'warning'
-            if 'critical' in line.lower() or 'high' in line.lower():
-                severity = 'critical'
-            elif 'error' in line.lower():
-                severity = 'error'
-            
-            events.append(TimelineEvent(
-                timestamp=ts,
-                timestamp_str=ts_str,
-                kind='alert',
-                title='Alert triggered',
-                details=line[:500],
-                severity=severity,
-                evidence=[Evidence(
-                    source_id=source_id,
-                    excerpt=line[:300],
-                    relevance=0.9,
-                    artifact_type=ArtifactType.ALERTS
-                )]
-            ))
+    for line in _matching_lines(content, ALERT_HINT_RE):
+        ts, ts_str = extract_timestamp_both(line)
+        
+        # Determine severity from content
+        lowered = line.lower()
+        severity = 'warning'
+        if 'critical' in lowered or 'high' in lowered:
+            severity = 'critical'
+        elif 'error' in lowered:
+            severity = 'error'
+        
+        events.append(TimelineEvent(
+            timestamp=ts,
+            timestamp_str=ts_str,
+            kind='alert',
+            title='Alert triggered',
+            details=line[:500],
+            severity=severity,
+            evidence=[Evidence(
+                source_id=source_id,
+                excerpt=line[:300],
+                relevance=0.9,
+                artifact_type=ArtifactType.ALERTS
+            )]
+        ))
     
     return events
 
@@ -227,30 +337,34 @@ def parse_artifact(artifact: Artifact) -> list[TimelineEvent]:
 
 
 def extract_what_changed(artifacts: list[Artifact]) -> list[dict]:
-    """Extract 'what changed' from artifacts."""
+    """Extract 'what changed' from artifacts.
+    
+    Changes are reported pattern by pattern, so each pattern keeps its own
+    scan of the content; a single alternation would let one kind's match
+    swallow another's (a deploy line that also names its version).
+    """
     changes = []
     
     for artifact in artifacts:
+        content = artifact.content
         if artifact.type == ArtifactType.DEPLOY_HISTORY:
             # Look for version changes, config changes
             for pattern, kind in DEPLOY_PATTERNS:
-                matches = re.findall(pattern, artifact.content)
-                for match in matches:
+                for match in pattern.finditer(content):
                     changes.append({
                         'category': 'deployment',
-                        'description': f"{kind}: {match[1] if len(match) > 1 else match[0]}",
+                        'description': f"{kind}: {match[2]}",
                         'source_id': artifact.source_id,
                         'artifact_type': artifact.type
                     })
         
         # Look for config changes
-        if 'config' in artifact.content.lower() or 'setting' in artifact.content.lower():
-            config_pattern = r'(?i)(config|setting|parameter)[:\s]+(\w+)[:\s=]+([^\n]+)'
-            matches = re.findall(config_pattern, artifact.content)
-            for match in matches:
+        lowered = content.lower()
+        if 'config' in lowered or 'setting' in lowered:
+            for match in CONFIG_PATTERN.finditer(content):
                 changes.append({
                     'category': 'config',
-                    'description': f"{match[1]} = {match[2][:50]}",
+                    'description': f"{match[2]} = {match[3][:50]}",
                     'source_id': artifact.source_id,
                     'artifact_type': artifact.type
                 })
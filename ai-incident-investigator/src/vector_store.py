@@ -1,17 +1,103 @@
 """Vector store for incident artifact embeddings."""
 
+import asyncio
 import chromadb
+import hashlib
+import httpx
+import numpy as np
+import sqlite3
+import threading
+import tiktoken
+import time
 from chromadb.config import Settings as ChromaSettings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime, timezone
+from functools import lru_cache
 from openai import OpenAI
+from pathlib import Path
 from typing import Optional
 import logging
 import re
 
 from .config import get_settings
-from .models import Artifact, Evidence
+from .models import Artifact, ArtifactType, Evidence
+from .parsers import extract_unix_time
 
 logger = logging.getLogger(__name__)
 
+# Input limit of the OpenAI embedding models, in tokens
+EMBEDDING_MAX_TOKENS = 8191
+
+# Most chunks sent per embeddings call. Chunks are at most 500 characters,
+# so a full batch stays far below the API's input and token limits.
+EMBEDDING_BATCH_MAX_ITEMS = 256
+
+# Time range stored on undated chunks, so every time window includes them
+UNDATED_RANGE = (0, 2**53 - 1)
+
+# Collection handles kept per store; a handle is a small client-side object
+COLLECTION_CACHE_MAX_ENTRIES = 256
+
+# Most text hashes looked up per query, below SQLite's variable limit
+EMBEDDING_STORE_LOOKUP_BATCH = 500
+
+EMBEDDING_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    hash BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, hash)
+) WITHOUT ROWID;
+"""
+
+
+def _text_hash(text: str) -> bytes:
+    """Content address of a text in the embedding store."""
+    return hashlib.sha256(text.encode()).digest()
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Tokenizer for a model, used for token budgets and truncation."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Newer models are unknown to older tiktoken releases
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _unix_time(ts: datetime) -> int:
+    """Seconds since the epoch, reading naive timestamps as UTC."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp())
+
+
+def _chunk_time_range(chunk: str, fallback: Optional[datetime]) -> tuple[int, int]:
+    """Return the (first, last) unix times covered by a chunk.
+    
+    Uses the first and last timestamped lines of the chunk, then the
+    artifact's own timestamp. Line stamps keep their UTC offsets, since
+    the window filter compares absolute times. Syslog-style stamps carry
+    no year and are skipped.
+    """
+    stamps = []
+    lines = chunk.split('\n')
+    for candidates in (lines, reversed(lines)):
+        for line in candidates:
+            ts = extract_unix_time(line)
+            if ts is not None:
+                stamps.append(ts)
+                break
+    
+    if not stamps and fallback:
+        stamps = [_unix_time(fallback)]
+    if not stamps:
+        return UNDATED_RANGE
+    return stamps[0], stamps[-1]
+
 
 class IncidentVectorStore:
     """Manages embeddings for incident artifacts using ChromaDB."""
@@ -21,10 +107,34 @@ class IncidentVectorStore:
         
         self.persist_directory = persist_directory or settings.chroma_persist_directory
         self.embedding_model = settings.embedding_model
+        self.hnsw_search_ef = settings.hnsw_search_ef
+        self.hnsw_m = settings.hnsw_m
+        self.hnsw_construction_ef = settings.hnsw_construction_ef
         
+        # Query embeddings keyed by model and text, least recently used first.
+        # Searches run on worker threads, hence the lock.
+        self.embedding_cache_ttl = settings.embedding_cache_ttl_seconds
+        self.embedding_cache_max_entries = settings.embedding_cache_max_entries
+        self.embedding_cache_dtype = np.dtype(settings.embedding_cache_dtype)
+        self._embedding_cache: OrderedDict[str, tuple[float, np.ndarray]] = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        self._embedding_cache_hits = 0
+        self._embedding_cache_misses = 0
+        
+        # Used from worker threads; httpx.Client pools connections across them
         self.openai_client = OpenAI(
             api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base
+            base_url=settings.openai_api_base,
+            http_client=httpx.Client(
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+            )
+        )
+        # Large ingests span several embedding batches; these are independent
+        # requests, so a few are kept in flight instead of sent one by one
+        self._embed_executor = ThreadPoolExecutor(
+            max_workers=settings.embedding_max_concurrency,
+            thread_name_prefix="embed"
         )
         
         self.chroma_client = chromadb.Client(ChromaSettings(
@@ -32,25 +142,211 @@ class IncidentVectorStore:
             is_persistent=True,
             persist_directory=self.persist_directory
         ))
+        
+        # Every embedding fetched from the API, keyed by model and text hash,
+        # so re-ingested chunks and repeated queries are not embedded again,
+        # even after a restart. Vectors are stored as raw float32 bytes.
+        self.embedding_store_path = None
+        if settings.embedding_store_enabled:
+            Path(self.persist_directory).mkdir(parents=True, exist_ok=True)
+            self.embedding_store_path = Path(self.persist_directory) / "embeddings.db"
+            with closing(self._connect_store()) as conn, conn:
+                conn.executescript(EMBEDDING_STORE_SCHEMA)
+        
+        # case_id -> Chroma collection handle, least recently used first, so
+        # searches skip the catalog lookup in get_or_create_collection
+        self._collections: OrderedDict[str, chromadb.Collection] = OrderedDict()
+        self._collections_lock = threading.Lock()
+    
+    def close(self) -> None:
+        """Stop the embedding threads and close the pooled OpenAI client."""
+        self._embed_executor.shutdown(cancel_futures=True)
+        self.openai_client.close()
     
     def _get_collection(self, case_id: str):
-        """Get or create a collection for a case."""
+        """Get or create a collection for a case.
+        
+        Graph parameters only apply when the collection is first created.
+        Chroma's default search_ef of 10 is below the usual top_k, so the
+        search breadth is set explicitly.
+        """
+        with self._collections_lock:
+            collection = self._collections.get(case_id)
+            if collection is not None:
+                self._collections.move_to_end(case_id)
+                return collection
+        
         collection_name = f"case_{case_id.replace('-', '_')[:50]}"
-        return self.chroma_client.get_or_create_collection(
+        collection = self.chroma_client.get_or_create_collection(
             name=collection_name,
-            metadata={"hnsw:space": "cosine"}
+            metadata={
+                "hnsw:space": "cosine",
+                "hnsw:construction_ef": self.hnsw_construction_ef,
+                "hnsw:M": self.hnsw_m,
+                "hnsw:search_ef": self.hnsw_search_ef
+            }
         )
+        
+        self._backfill_time_ranges(case_id, collection)
+        
+        with self._collections_lock:
+            self._collections[case_id] = collection
+            while len(self._collections) > COLLECTION_CACHE_MAX_ENTRIES:
+                self._collections.popitem(last=False)
+        return collection
+    
+    def _backfill_time_ranges(self, case_id: str, collection) -> None:
+        """Add ts_first/ts_last to chunks indexed before they were stored.
+        
+        Time-windowed searches filter on both fields, so chunks without
+        them would never match. Runs when a collection handle is loaded,
+        which is once per case while the handle stays cached.
+        """
+        stored = collection.get(include=["metadatas"])
+        legacy_ids = [
+            chunk_id for chunk_id, metadata in zip(stored["ids"], stored["metadatas"])
+            if "ts_first" not in metadata or "ts_last" not in metadata
+        ]
+        if not legacy_ids:
+            return
+        
+        legacy = collection.get(ids=legacy_ids, include=["documents", "metadatas"])
+        metadatas = []
+        for document, metadata in zip(legacy["documents"], legacy["metadatas"]):
+            raw = metadata.get("timestamp")
+            try:
+                fallback = datetime.fromisoformat(raw) if raw else None
+            except ValueError:
+                fallback = None
+            ts_first, ts_last = _chunk_time_range(document, fallback)
+            metadatas.append({**metadata, "ts_first": ts_first, "ts_last": ts_last})
+        
+        collection.update(ids=legacy["ids"], metadatas=metadatas)
+        logger.info(f"Backfilled time ranges for {len(legacy_ids)} chunks of case {case_id}")
     
     def _get_embedding(self, text: str) -> list[float]:
-        """Generate embedding for text."""
+        """Generate embedding for text, reusing cached embeddings."""
+        text = self._truncate_for_embedding(text)
+        key = self._embedding_cache_key(text)
+        cached = self._get_cached_embedding(key)
+        if cached is not None:
+            return cached
+        
+        text_hash = _text_hash(text)
+        embedding = self._load_stored_embeddings([text_hash]).get(text_hash)
+        if embedding is None:
+            response = self.openai_client.embeddings.create(
+                model=self.embedding_model,
+                input=text
+            )
+            embedding = response.data[0].embedding
+            self._store_embeddings([(text_hash, embedding)])
+        
+        self._store_cached_embedding(key, embedding)
+        return embedding
+    
+    def _truncate_for_embedding(self, text: str) -> str:
+        """Cut text to the embedding model's token limit."""
+        # Every token covers at least one UTF-8 byte and a character takes
+        # at most four, so short texts are returned without tokenizing
+        if len(text) * 4 <= EMBEDDING_MAX_TOKENS:
+            return text
+        
+        encoding = get_encoding(self.embedding_model)
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= EMBEDDING_MAX_TOKENS:
+            return text
+        return encoding.decode(tokens[:EMBEDDING_MAX_TOKENS])
+    
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        """Embed a batch of chunks in one call, in input order."""
         response = self.openai_client.embeddings.create(
             model=self.embedding_model,
-            input=text[:8000]  # Truncate to avoid token limits
+            input=batch
         )
-        return response.data[0].embedding
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+    
+    def _connect_store(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.embedding_store_path, check_same_thread=False)
+    
+    def _load_stored_embeddings(self, hashes: list[bytes]) -> dict[bytes, list[float]]:
+        """Return stored embeddings of the current model by text hash."""
+        if not self.embedding_store_path or not hashes:
+            return {}
+        
+        found = {}
+        with closing(self._connect_store()) as conn:
+            for i in range(0, len(hashes), EMBEDDING_STORE_LOOKUP_BATCH):
+                batch = hashes[i:i + EMBEDDING_STORE_LOOKUP_BATCH]
+                rows = conn.execute(
+                    f"SELECT hash, vector FROM embeddings "
+                    f"WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                    (self.embedding_model, *batch)
+                )
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float32).tolist()
+        return found
+    
+    def _store_embeddings(self, items: list[tuple[bytes, list[float]]]) -> None:
+        """Persist (text hash, embedding) pairs for the current model."""
+        if not self.embedding_store_path or not items:
+            return
+        
+        with closing(self._connect_store()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [
+                    (self.embedding_model, text_hash, np.asarray(embedding, dtype=np.float32).tobytes())
+                    for text_hash, embedding in items
+                ]
+            )
+    
+    def _embedding_cache_key(self, text: str) -> str:
+        """Key an embedding by model and (truncated) input text."""
+        return hashlib.sha256(f"{self.embedding_model}:{text}".encode()).hexdigest()
+    
+    def _get_cached_embedding(self, key: str) -> Optional[list[float]]:
+        """Return a cached embedding if present and not expired."""
+        with self._embedding_cache_lock:
+            entry = self._embedding_cache.get(key)
+            if entry is None:
+                self._embedding_cache_misses += 1
+                return None
+            
+            stored_at, embedding = entry
+            if time.monotonic() - stored_at > self.embedding_cache_ttl:
+                del self._embedding_cache[key]
+                self._embedding_cache_misses += 1
+                return None
+            
+            self._embedding_cache.move_to_end(key)
+            self._embedding_cache_hits += 1
+        return embedding.tolist()
+    
+    def _store_cached_embedding(self, key: str, embedding: list[float]) -> None:
+        """Cache an embedding, evicting the least recently used entries."""
+        entry = (time.monotonic(), np.asarray(embedding, dtype=self.embedding_cache_dtype))
+        with self._embedding_cache_lock:
+            self._embedding_cache[key] = entry
+            self._embedding_cache.move_to_end(key)
+            while len(self._embedding_cache) > self.embedding_cache_max_entries:
+                self._embedding_cache.popitem(last=False)
+    
+    def get_embedding_cache_stats(self) -> dict:
+        """Report entry count and hit/miss totals for the query embedding cache."""
+        with self._embedding_cache_lock:
+            return {
+                "entries": len(self._embedding_cache),
+                "hits": self._embedding_cache_hits,
+                "misses": self._embedding_cache_misses
+            }
     
     def _chunk_content(self, content: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
-        """Split content into overlapping chunks."""
+        """Split content into overlapping chunks.
+        
+        Boundaries are searched in place with bounded rfind calls, so each
+        chunk is sliced out of the content once.
+        """
         if len(content) <= chunk_size:
             return [content]
         
@@ -58,21 +354,19 @@ class IncidentVectorStore:
         start = 0
         while start < len(content):
             end = start + chunk_size
-            chunk = content[start:end]
             
             # Try to break at sentence boundary
             if end < len(content):
-                last_period = chunk.rfind('.')
-                last_newline = chunk.rfind('\n')
-                break_point = max(last_period, last_newline)
-                if break_point > chunk_size // 2:
-                    chunk = chunk[:break_point + 1]
-                    end = start + break_point + 1
+                break_point = max(content.rfind('.', start, end), content.rfind('\n', start, end))
+                if break_point > start + chunk_size // 2:
+                    end = break_point + 1
             
-            chunks.append(chunk.strip())
+            chunk = content[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
             start = end - overlap
         
-        return [c for c in chunks if c]
+        return chunks
     
     def index_artifacts(self, case_id: str, artifacts: list[Artifact]) -> int:
         """Index artifacts for a case."""
@@ -87,28 +381,46 @@ class IncidentVectorStore:
             
             for i, chunk in enumerate(chunks):
                 chunk_id = f"{artifact.source_id}_{i}"
+                ts_first, ts_last = _chunk_time_range(chunk, artifact.timestamp)
                 all_chunks.append(chunk)
                 all_ids.append(chunk_id)
                 all_metadatas.append({
                     "source_id": artifact.source_id,
                     "artifact_type": artifact.type.value,
                     "chunk_index": i,
-                    "timestamp": str(artifact.timestamp) if artifact.timestamp else ""
+                    "timestamp": str(artifact.timestamp) if artifact.timestamp else "",
+                    "ts_first": ts_first,
+                    "ts_last": ts_last
                 })
         
         if not all_chunks:
             return 0
         
-        # Generate embeddings in batch
-        embeddings = []
-        batch_size = 20
-        for i in range(0, len(all_chunks), batch_size):
-            batch = all_chunks[i:i + batch_size]
-            response = self.openai_client.embeddings.create(
-                model=self.embedding_model,
-                input=batch
-            )
-            embeddings.extend([item.embedding for item in response.data])
+        # Only text never embedded before is sent, each distinct chunk once
+        hashes = [_text_hash(chunk) for chunk in all_chunks]
+        known = self._load_stored_embeddings(list(dict.fromkeys(hashes)))
+        missing = {}
+        for text_hash, chunk in zip(hashes, all_chunks):
+            if text_hash not in known:
+                missing.setdefault(text_hash, chunk)
+        
+        if missing:
+            # Embed chunks from every artifact together, in as few calls as
+            # possible; map yields the batches back in chunk order
+            texts = list(missing.values())
+            batches = [
+                texts[i:i + EMBEDDING_BATCH_MAX_ITEMS]
+                for i in range(0, len(texts), EMBEDDING_BATCH_MAX_ITEMS)
+            ]
+            fresh = []
+            for batch_embeddings in self._embed_executor.map(self._embed_batch, batches):
+                fresh.extend(batch_embeddings)
+            
+            fresh_items = list(zip(missing, fresh))
+            self._store_embeddings(fresh_items)
+            known.update(fresh_items)
+        
+        embeddings = [known[text_hash] for text_hash in hashes]
         
         # Add to collection
         collection.add(
@@ -118,25 +430,49 @@ class IncidentVectorStore:
             metadatas=all_metadatas
         )
         
-        logger.info(f"Indexed {len(all_chunks)} chunks for case {case_id}")
+        logger.info(
+            f"Indexed {len(all_chunks)} chunks for case {case_id} "
+            f"({len(missing)} newly embedded)"
+        )
         return len(all_chunks)
     
+    async def aindex_artifacts(self, case_id: str, artifacts: list[Artifact]) -> int:
+        """Index artifacts without blocking the event loop."""
+        return await asyncio.to_thread(self.index_artifacts, case_id, artifacts)
+    
     def search(
         self,
         case_id: str,
         query: str,
         top_k: int = 8,
-        exclude_sources: list[str] = None
+        exclude_sources: list[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
     ) -> list[Evidence]:
-        """Search for relevant evidence."""
+        """Search for relevant evidence.
+        
+        Excluded sources and the time window are applied by the index
+        before ranking, so top_k hits are never spent on filtered chunks.
+        A chunk is in the window when its time range overlaps it; undated
+        chunks always are.
+        """
         collection = self._get_collection(case_id)
         
         query_embedding = self._get_embedding(query)
         
-        # Build where filter if excluding sources
-        where_filter = None
+        conditions = []
         if exclude_sources:
-            where_filter = {"source_id": {"$nin": exclude_sources}}
+            conditions.append({"source_id": {"$nin": exclude_sources}})
+        if start_time:
+            conditions.append({"ts_last": {"$gte": _unix_time(start_time)}})
+        if end_time:
+            conditions.append({"ts_first": {"$lte": _unix_time(end_time)}})
+        
+        where_filter = None
+        if len(conditions) == 1:
+            where_filter = conditions[0]
+        elif conditions:
+            where_filter = {"$and": conditions}
         
         results = collection.query(
             query_embeddings=[query_embedding],
@@ -145,18 +481,18 @@ class IncidentVectorStore:
             where=where_filter
         )
         
+        # Chroma ranks by cosine distance inside its HNSW index; only the
+        # returned top_k hits are converted here
         evidence_list = []
         if results["ids"] and results["ids"][0]:
-            for i, doc_id in enumerate(results["ids"][0]):
-                distance = results["distances"][0][i]
+            for document, metadata, distance in zip(
+                results["documents"][0], results["metadatas"][0], results["distances"][0]
+            ):
                 relevance = 1 - distance  # Convert cosine distance to similarity
                 
-                metadata = results["metadatas"][0][i]
-                from .models import ArtifactType
-                
                 evidence_list.append(Evidence(
                     source_id=metadata.get("source_id", "unknown"),
-                    excerpt=results["documents"][0][i][:300],
+                    excerpt=document[:300],
                     relevance=round(max(0, min(1, relevance)), 4),
                     artifact_type=ArtifactType(metadata.get("artifact_type", "logs"))
                 ))
@@ -174,6 +510,8 @@ class IncidentVectorStore:
     def delete_case(self, case_id: str) -> None:
         """Delete all embeddings for a case."""
         collection_name = f"case_{case_id.replace('-', '_')[:50]}"
+        with self._collections_lock:
+            self._collections.pop(case_id, None)
         try:
             self.chroma_client.delete_collection(collection_name)
         except Exception as e:
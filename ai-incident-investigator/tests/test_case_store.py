@@ -1,12 +1,26 @@
 """Tests for case storage."""
 
+import json
 import pytest
 import tempfile
 import shutil
 from pathlib import Path
 
+import zstandard
+
 from src.case_store import CaseStore
-from src.models import IngestRequest, Artifact, ArtifactType, CaseStatus
+from src.models import (
+    IngestRequest, Artifact, ArtifactType, CaseStatus, FeedbackRequest, FeedbackType,
+    AnalyzeResponse
+)
+
+
+def read_case_file(path: Path) -> dict:
+    return json.loads(zstandard.ZstdDecompressor().decompress(path.read_bytes()))
+
+
+def write_case_file(path: Path, case_data: dict) -> None:
+    path.write_bytes(zstandard.ZstdCompressor().compress(json.dumps(case_data).encode()))
 
 
 @pytest.fixture
@@ -106,6 +120,18 @@ class TestCaseStore:
         assert len(cases) == 2
         assert all(c.artifact_count >= 1 for c in cases)
     
+    def test_count_cases(self, temp_cases_dir, sample_request):
+        """Test that the cached count tracks created and existing cases."""
+        case_store = CaseStore(cases_dir=temp_cases_dir)
+        assert case_store.count_cases() == 0
+        
+        case_store.create_case(sample_request)
+        case_store.create_case(sample_request)
+        assert case_store.count_cases() == 2
+        
+        assert CaseStore(cases_dir=temp_cases_dir).count_cases() == 2
+        assert CaseStore(cases_dir=temp_cases_dir, use_sqlite=False).count_cases() == 2
+    
     def test_get_artifacts(self, case_store, sample_request):
         """Test getting artifacts for a case."""
         case_id = case_store.create_case(sample_request)
@@ -137,3 +163,135 @@ class TestCaseStore:
         
         # Most recent should be first
         assert cases[0].title == "Second"
+    
+    def test_feedback_appended_to_log(self, case_store, sample_request, temp_cases_dir):
+        """Test that feedback is appended without rewriting the case file."""
+        case_id = case_store.create_case(sample_request)
+        case_path = Path(temp_cases_dir) / f"{case_id}.json.zst"
+        case_before = case_path.read_bytes()
+        
+        case_store.add_feedback(case_id, FeedbackRequest(
+            hypothesis_rank=1, feedback_type=FeedbackType.CONFIRMED
+        ))
+        case_store.add_feedback(case_id, FeedbackRequest(
+            hypothesis_rank=1, feedback_type=FeedbackType.REJECTED
+        ))
+        
+        assert case_path.read_bytes() == case_before
+        assert len(case_store.get_feedback(case_id)) == 2
+        assert case_store.get_hypothesis_feedback(case_id, 1).feedback_type == FeedbackType.REJECTED
+    
+    def test_legacy_case_file_migrated(self, case_store, sample_request, temp_cases_dir):
+        """Test that uncompressed case files with inline feedback are kept."""
+        case_id = case_store.create_case(sample_request)
+        case_path = Path(temp_cases_dir) / f"{case_id}.json.zst"
+        case_data = read_case_file(case_path)
+        case_data["feedback"] = [{
+            "hypothesis_rank": 2,
+            "hypothesis_title": "Hypothesis #2",
+            "feedback_type": "uncertain",
+            "reviewer_note": None,
+            "timestamp": "2024-01-15T14:32:15"
+        }]
+        case_path.unlink()
+        (Path(temp_cases_dir) / f"{case_id}.json").write_text(json.dumps(case_data))
+        
+        case_store = CaseStore(cases_dir=temp_cases_dir)
+        
+        assert not (Path(temp_cases_dir) / f"{case_id}.json").exists()
+        assert len(case_store.get_feedback(case_id)) == 1
+        
+        case_store.add_feedback(case_id, FeedbackRequest(
+            hypothesis_rank=1, feedback_type=FeedbackType.CONFIRMED
+        ))
+        
+        assert "feedback" not in read_case_file(case_path)
+        assert [f.hypothesis_rank for f in case_store.get_feedback(case_id)] == [2, 1]
+    
+    def test_external_edit_invalidates_cache(self, case_store, sample_request, temp_cases_dir):
+        """Test that cached cases are reloaded when the file changes on disk."""
+        case_id = case_store.create_case(sample_request)
+        json_store = CaseStore(cases_dir=temp_cases_dir, use_sqlite=False)
+        assert case_store.get_case(case_id).title == "Test Incident"
+        assert json_store.list_cases()[0].title == "Test Incident"
+        
+        case_path = Path(temp_cases_dir) / f"{case_id}.json.zst"
+        case_data = read_case_file(case_path)
+        case_data["title"] = "Renamed Incident"
+        write_case_file(case_path, case_data)
+        
+        assert case_store.get_case(case_id).title == "Renamed Incident"
+        assert json_store.list_cases()[0].title == "Renamed Incident"
+    
+    def test_list_cases_reflects_updates(self, temp_cases_dir, sample_request):
+        """Test that file scan listings pick up status changes and deletions."""
+        case_store = CaseStore(cases_dir=temp_cases_dir, use_sqlite=False)
+        case_id = case_store.create_case(sample_request)
+        other_id = case_store.create_case(sample_request)
+        case_store.list_cases()
+        
+        case_store.update_status(case_id, CaseStatus.INGESTED)
+        Path(case_store.cases_dir / f"{other_id}.json.zst").unlink()
+        
+        cases = case_store.list_cases()
+        assert [(c.case_id, c.status) for c in cases] == [(case_id, CaseStatus.INGESTED)]
+    
+    def test_manifest_backfills_existing_cases(self, temp_cases_dir, sample_request):
+        """Test that cases written without the manifest are picked up on startup."""
+        json_store = CaseStore(cases_dir=temp_cases_dir, use_sqlite=False)
+        case_id = json_store.create_case(sample_request)
+        
+        indexed_store = CaseStore(cases_dir=temp_cases_dir, use_sqlite=True)
+        assert [c.case_id for c in indexed_store.list_cases()] == [case_id]
+    
+    def test_manifest_matches_json_scan(self, case_store, sample_request, temp_cases_dir):
+        """Test that manifest listings match the case file scan."""
+        first_id = case_store.create_case(sample_request)
+        second_id = case_store.create_case(sample_request)
+        case_store.update_status(first_id, CaseStatus.INGESTED)
+        case_store.save_analysis(second_id, AnalyzeResponse(
+            case_id=second_id,
+            timeline_events=[],
+            hypotheses=[],
+            what_changed=[],
+            recommended_next_steps=[],
+            confidence_overall=0.75
+        ))
+        json_store = CaseStore(cases_dir=temp_cases_dir, use_sqlite=False)
+        
+        assert case_store.list_cases() == json_store.list_cases()
+        assert case_store.list_cases()[0].confidence_overall == 0.75
+    
+    def test_get_case_without_analysis(self, case_store, sample_request):
+        """Test that the last analysis can be skipped when loading a case."""
+        case_id = case_store.create_case(sample_request)
+        case_store.save_analysis(case_id, AnalyzeResponse(
+            case_id=case_id,
+            timeline_events=[],
+            hypotheses=[],
+            what_changed=[],
+            recommended_next_steps=["Check logs"],
+            confidence_overall=0.5
+        ))
+        
+        assert case_store.get_case(case_id).last_analysis.recommended_next_steps == ["Check logs"]
+        
+        case = case_store.get_case(case_id, include_analysis=False)
+        assert case.last_analysis is None
+        assert case.status == CaseStatus.ANALYZED
+    
+    async def test_async_wrappers(self, case_store, sample_request):
+        """Test the event-loop friendly wrappers."""
+        case_id = await case_store.acreate_case(sample_request)
+        await case_store.aupdate_status(case_id, CaseStatus.INGESTED)
+        
+        case = await case_store.aget_case(case_id)
+        assert case.status == CaseStatus.INGESTED
+        
+        cases = await case_store.alist_cases()
+        assert [c.case_id for c in cases] == [case_id]
+        
+        await case_store.aadd_feedback(case_id, FeedbackRequest(
+            hypothesis_rank=1, feedback_type=FeedbackType.CONFIRMED
+        ))
+        assert len(await case_store.aget_feedback(case_id)) == 1
@@ -5,6 +5,7 @@ from datetime import datetime
 from src.parsers import (
     extract_timestamp,
     extract_timestamp_str,
+    extract_unix_time,
     parse_log_lines,
     parse_deploy_history,
     extract_what_changed
@@ -56,6 +57,20 @@ class TestTimestampExtraction:
         ts_str = extract_timestamp_str(log)
         
         assert ts_str == "unknown"
+    
+    def test_unix_time_applies_offset(self):
+        """Test that UTC offsets are applied when converting to unix time."""
+        utc = extract_unix_time("2024-01-15T14:32:15Z ERROR Something failed")
+        offset = extract_unix_time("2024-01-15T19:32:15.250+05:00 ERROR Something failed")
+        
+        assert utc == 1705329135
+        assert offset == utc
+    
+    def test_unix_time_epoch_and_syslog(self):
+        """Test that epoch stamps are kept as written and syslog stamps are skipped."""
+        assert extract_unix_time("1705329135 ERROR Something failed") == 1705329135
+        assert extract_unix_time("1705329135250 ERROR Something failed") == 1705329135
+        assert extract_unix_time("Jan 15 14:32:15 host ERROR Something failed") is None
 
 
 class TestLogParsing:
@@ -100,6 +115,14 @@ class TestLogParsing:
         assert len(events) >= 1
         assert any(e.kind == "auth" for e in events)
     
+    def test_first_listed_pattern_wins(self):
+        """Test that pattern order, not position in the line, picks the kind."""
+        logs = "2024-01-15T14:32:15Z WARN Request timeout, upstream error"
+        
+        events = parse_log_lines(logs, "test-source")
+        
+        assert [e.kind for e in events] == ["error"]
+    
     def test_event_has_evidence(self):
         """Test that events include evidence."""
         logs = "2024-01-15T14:32:15Z ERROR Something broke"
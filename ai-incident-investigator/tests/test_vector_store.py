@@ -0,0 +1,66 @@
+"""Tests for the incident vector store."""
+
+import pytest
+import tempfile
+import shutil
+from datetime import datetime
+from unittest.mock import patch
+
+pytest.importorskip("chromadb")
+
+from src.vector_store import IncidentVectorStore, _chunk_time_range
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for the Chroma index."""
+    temp_path = tempfile.mkdtemp()
+    yield temp_path
+    shutil.rmtree(temp_path)
+
+
+class TestIncidentVectorStore:
+    """Test suite for IncidentVectorStore."""
+    
+    def test_chunk_time_range_uses_offsets(self):
+        """Test that chunk ranges are absolute times, whatever the stamps' offsets."""
+        chunk = (
+            "2024-01-15T19:32:15+05:00 ERROR Connection pool exhausted\n"
+            "1705329600 WARN Retrying"
+        )
+        
+        assert _chunk_time_range(chunk, None) == (1705329135, 1705329600)
+    
+    def test_legacy_chunks_match_time_window(self, temp_dir):
+        """Test that chunks indexed without time ranges still match a time window."""
+        store = IncidentVectorStore(persist_directory=temp_dir)
+        collection = store._get_collection("legacy-case")
+        # Chunk metadata as written before ts_first/ts_last were stored
+        collection.add(
+            ids=["app_0", "app_1"],
+            embeddings=[[1.0, 0.0], [0.0, 1.0]],
+            documents=[
+                "2024-01-15T14:32:15Z ERROR Connection pool exhausted",
+                "Worker restarted"
+            ],
+            metadatas=[
+                {"source_id": "app", "artifact_type": "logs", "chunk_index": 0, "timestamp": ""},
+                {"source_id": "app", "artifact_type": "logs", "chunk_index": 1, "timestamp": ""}
+            ]
+        )
+        
+        # A restarted service opens the collection afresh
+        restarted = IncidentVectorStore(persist_directory=temp_dir)
+        with patch.object(restarted, "_get_embedding", return_value=[1.0, 0.0]):
+            evidence = restarted.search(
+                "legacy-case",
+                "connection errors",
+                start_time=datetime(2024, 1, 15, 14, 0),
+                end_time=datetime(2024, 1, 15, 15, 0)
+            )
+        
+        assert len(evidence) == 2
+        assert evidence[0].excerpt.startswith("2024-01-15T14:32:15Z")
+        
+        stored = collection.get(include=["metadatas"])
+        assert all("ts_first" in m and "ts_last" in m for m in stored["metadatas"])